@@ -0,0 +1,127 @@
+"""
+Measures extraction throughput offline, against the local fixture server.
+
+Headless Chrome goes through the real extraction code: extract_jobs and
+extract_skills_from_jobs (sequential mode) or extract_jobs_and_skills
+(pipeline mode). The extracted skills are checked against the fixture, and
+jobs per minute, accuracy and the run profile are printed and appended to
+results/extraction.jsonl. Needs Chrome; nothing is sent to LinkedIn.
+
+Usage (from the repository root):
+    python benchmarks/bench_extraction.py --jobs 100 --latency 0.05 --workers 2
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from common import use_vars, new_result, save_result
+from fixture_server import FixtureConfig, start_server
+
+def run_mode(mode, server, settings):
+    """Runs one extraction and returns its throughput and accuracy."""
+    from browser import get_browser, release_browser
+    from extraction import extract_jobs, extract_skills_from_jobs, extract_jobs_and_skills
+    from metrics import profiler
+
+    profiler.reset()
+    job_url = server.search_url(mode)
+    start = time.monotonic()
+    with profiler.stage('login'):
+        browser = get_browser(settings['cookies_file'])
+    if browser is None:
+        raise SystemExit("Chrome could not be started, see the log above")
+    if mode == 'sequential':
+        job_ids = extract_jobs(browser, job_url)
+        skills = extract_skills_from_jobs(browser, job_ids, job_url)
+    else:
+        skills = extract_jobs_and_skills(browser, job_url)
+    elapsed = time.monotonic() - start
+    release_browser(browser)
+
+    config = server.config
+    extracted = _extracted_skills(settings['ext_folder'], job_url)
+    correct = sum(extracted.get(job_id) == config.job_skills(job_id)
+                  for job_id in config.job_ids if config.has_details(job_id))
+    expected = sum(config.has_details(job_id) for job_id in config.job_ids)
+    summary = profiler.report()
+    print(f"\n{mode}: {len(skills)} job(s) in {elapsed:.1f} s, "
+          f"{len(skills) / elapsed * 60:.1f} jobs/min, {correct}/{expected} correct")
+    print(profiler.summary())
+    return {
+        'jobs': len(skills),
+        'seconds': round(elapsed, 2),
+        'jobs_per_minute': round(len(skills) / elapsed * 60, 1),
+        'correct': correct,
+        'expected': expected,
+        'profile': summary,
+    }
+
+def _extracted_skills(ext_folder, job_url):
+    """Reads the journal written for job_url back as job ID -> skills."""
+    extracted = {}
+    for name in os.listdir(ext_folder):
+        if not name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(ext_folder, name), 'r') as file:
+            for line in file:
+                record = json.loads(line)
+                if record.get('search_url') == job_url and record.get('skills'):
+                    extracted[str(record['job_id'])] = record['skills']
+    return extracted
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline extraction benchmark against the fixture server")
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.05, help="mean server delay in seconds")
+    parser.add_argument('--jitter', type=float, default=0.02, help="standard deviation of the delay")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of job pages answered with 500")
+    parser.add_argument('--missing-rate', type=float, default=0.0, help="share of jobs without qualification details")
+    parser.add_argument('--modal-delay', type=float, default=0.1, help="seconds before the modal is rendered")
+    parser.add_argument('--workers', type=int, default=1, help="extraction_workers")
+    parser.add_argument('--mode', choices=('sequential', 'pipeline', 'both'), default='both')
+    parser.add_argument('--pagination', choices=('click', 'offset'), default='click', help="pagination mode")
+    parser.add_argument('--http-fast-path', action='store_true', help="serve the modal markup and enable http_fast_path")
+    parser.add_argument('--show-browser', action='store_true', help="do not run Chrome headless")
+    parser.add_argument('--no-save', action='store_true', help="do not append to the results history")
+    args = parser.parse_args()
+
+    config = FixtureConfig(jobs=args.jobs, page_size=args.page_size, latency=args.latency, jitter=args.jitter,
+                           failure_rate=args.failure_rate, missing_rate=args.missing_rate,
+                           modal_delay=args.modal_delay, inline_modal=args.http_fast_path)
+    server = start_server(config)
+    folder = tempfile.mkdtemp(prefix='skilledin-bench-')
+    settings = use_vars(
+        folder,
+        linkedin_url=server.url,
+        headless=not args.show_browser,
+        extraction_workers=args.workers,
+        pagination=args.pagination,
+        http_fast_path=args.http_fast_path,
+        # Every run visits all jobs
+        job_index_ttl_days=0,
+        keep_browser_warm=True,
+    )
+    # A saved session skips the login form
+    with open(settings['cookies_file'], 'w') as file:
+        json.dump([{'name': 'li_at', 'value': 'fixture', 'path': '/'}], file)
+    print(f"Fixture server on {server.url}, work folder {folder}")
+
+    result = new_result(**vars(args))
+    result['modes'] = {}
+    modes = ('sequential', 'pipeline') if args.mode == 'both' else (args.mode,)
+    try:
+        for mode in modes:
+            result['modes'][mode] = run_mode(mode, server, settings)
+    finally:
+        from browser import close_all
+        close_all()
+        server.shutdown()
+    result['server'] = server.stats
+    if not args.no_save:
+        save_result('extraction', result)
+
+if __name__ == '__main__':
+    main()
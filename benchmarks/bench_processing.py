@@ -0,0 +1,94 @@
+"""
+Measures skill processing on a synthetic large corpus.
+
+Generates jobs with a skewed skill distribution (1M skill occurrences by
+default, with case and spacing variants of every skill, like real
+extractions), then times:
+
+- process_all_skills on the in-memory skill lists (option 3)
+- process_all_files on the corpus split into journal files (option 5),
+  with a cold and a warm per-file cache
+
+Results are printed and appended to results/processing.jsonl.
+
+Usage (from the repository root):
+    python benchmarks/bench_processing.py [--skills 1000000] [--files 20]
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from common import use_vars, new_result, save_result
+
+def synthetic_jobs(total_skills, skills_per_job, vocabulary, seed=0):
+    """Returns skill lists adding up to total_skills occurrences."""
+    rng = random.Random(seed)
+    base = [f"Skill {i}" for i in range(vocabulary)]
+    variants = [(skill, skill.lower(), ' ' + skill, skill.replace(' ', '  ')) for skill in base]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    jobs = []
+    produced = 0
+    while produced < total_skills:
+        count = min(rng.randint(skills_per_job // 2, skills_per_job * 3 // 2), total_skills - produced)
+        jobs.append([rng.choice(variants[i]) for i in rng.choices(range(vocabulary), weights, k=count)])
+        produced += count
+    return jobs
+
+def write_corpus(jobs, ext_folder, files):
+    """Splits the jobs into journal files named like the extractions."""
+    per_file = -(-len(jobs) // files)
+    for n in range(files):
+        name = f"01-01-24_00:00:{n % 60:02d}-synthetic-{n}.jsonl"
+        with open(os.path.join(ext_folder, name), 'w') as file:
+            for i, skills in enumerate(jobs[n * per_file:(n + 1) * per_file]):
+                file.write(json.dumps({'job_id': f"{n}-{i}", 'search_url': '', 'timestamp': None,
+                                       'skills': skills}) + '\n')
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, round(time.perf_counter() - start, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic large-corpus processing benchmark")
+    parser.add_argument('--skills', type=int, default=1_000_000, help="total skill occurrences")
+    parser.add_argument('--skills-per-job', type=int, default=20)
+    parser.add_argument('--vocabulary', type=int, default=5000, help="distinct skills before variants")
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None, help="process_workers (default: cores)")
+    parser.add_argument('--no-save', action='store_true', help="do not append to the results history")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix='skilledin-bench-')
+    settings = use_vars(folder, process_workers=args.workers, processed_cache=True)
+    from process import process_all_skills, process_all_files, normalize_skill
+
+    jobs, generate = timed(synthetic_jobs, args.skills, args.skills_per_job, args.vocabulary)
+    _, write = timed(write_corpus, jobs, settings['ext_folder'], args.files)
+    print(f"{len(jobs)} job(s), {args.skills} skill(s), {args.files} file(s) in {folder}")
+
+    result = new_result(**vars(args))
+    result['jobs'] = len(jobs)
+    result['seconds'] = {'generate': generate, 'write': write}
+    (df, jobtotal), result['seconds']['process_all_skills'] = timed(process_all_skills, jobs)
+    normalize_skill.cache_clear()
+    _, result['seconds']['process_all_files_cold'] = timed(process_all_files)
+    normalize_skill.cache_clear()
+    (df_files, _), result['seconds']['process_all_files_warm'] = timed(process_all_files)
+    result['distinct_skills'] = len(df)
+    by_skill = lambda frame: frame.sort_values(by='Skill').reset_index(drop=True)
+    if not by_skill(df).equals(by_skill(df_files)):
+        print("Warning: in-memory and file results differ")
+
+    for name, seconds in result['seconds'].items():
+        print(f"{name:<24} {seconds:8.3f} s")
+    rate = args.skills / max(result['seconds']['process_all_skills'], 1e-9)
+    print(f"process_all_skills: {rate / 1e6:.2f}M skills/s, {jobtotal} job(s), {len(df)} distinct skill(s)")
+    if not args.no_save:
+        save_result('processing', result)
+
+if __name__ == '__main__':
+    main()
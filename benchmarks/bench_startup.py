@@ -0,0 +1,68 @@
+"""
+Measures the cold-start time of the tool.
+
+Every case runs in a fresh interpreter, so imports are not shared between
+runs. The median and best times of each case are printed and appended to
+results/startup.jsonl, one line per benchmark run, to track them over time.
+
+Usage (from the repository root, with src/vars.py in place):
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+from common import SRC, new_result, save_result
+
+# name -> interpreter arguments, run inside src
+CASES = {
+    'import-main': ['-c', 'import main'],
+    'analyze-help': ['main.py', 'analyze', '--help'],
+    'import-process': ['-c', 'import process'],
+    'import-browser-stack': ['-c', 'import utils'],
+}
+
+# Modules that must not be loaded by a plain "import main"
+HEAVY_MODULES = ('selenium', 'webdriver_manager', 'openpyxl', 'pandas', 'numpy')
+
+def time_case(args, runs):
+    """Runs a case in fresh interpreters and returns the wall times in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=SRC, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def loaded_heavy_modules():
+    """Returns the heavy modules a plain "import main" loads."""
+    script = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', script], cwd=SRC, check=True,
+                            capture_output=True, text=True).stdout.strip()
+    return [module for module in output.split(',') if module]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help="runs per case (default: 10)")
+    parser.add_argument('--no-save', action='store_true', help="do not append to the results history")
+    args = parser.parse_args()
+
+    result = new_result(runs=args.runs)
+    result['cases'] = {}
+    for name, case in CASES.items():
+        timings = time_case(case, args.runs)
+        result['cases'][name] = {'median_ms': round(statistics.median(timings), 1),
+                                 'min_ms': round(min(timings), 1)}
+        print(f"{name:<22} median {statistics.median(timings):8.1f} ms   min {min(timings):8.1f} ms")
+    result['heavy_modules_on_import'] = loaded_heavy_modules()
+    if result['heavy_modules_on_import']:
+        print("Warning: importing main loads " + ', '.join(result['heavy_modules_on_import']))
+
+    if not args.no_save:
+        save_result('startup', result)
+
+if __name__ == '__main__':
+    main()
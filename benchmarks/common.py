@@ -0,0 +1,62 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def use_vars(folder, **settings):
+    """
+    Writes a vars.py with the given settings into folder and makes src importable.
+
+    The folder goes first on sys.path, so the benchmark configuration is used
+    instead of the user's src/vars.py and real extractions are not touched.
+    """
+    settings.setdefault('username', 'fixture')
+    settings.setdefault('password', 'fixture')
+    settings.setdefault('stopwords', set())
+    settings.setdefault('default_job_url', '')
+    settings.setdefault('cookies_file', os.path.join(folder, 'cookies.json'))
+    settings.setdefault('ext_folder', os.path.join(folder, 'extract') + os.sep)
+    settings.setdefault('exp_folder', os.path.join(folder, 'export') + os.sep)
+    os.makedirs(settings['ext_folder'], exist_ok=True)
+    os.makedirs(settings['exp_folder'], exist_ok=True)
+    with open(os.path.join(folder, 'vars.py'), 'w') as file:
+        file.write("import logging\n\n")
+        for name, value in settings.items():
+            file.write(f"{name} = {value!r}\n")
+        file.write("\nlogging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')\n")
+    for path in (SRC, folder):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    return settings
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def new_result(**params):
+    """Starts a result record with the run metadata."""
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'params': params,
+    }
+
+def save_result(name, result):
+    """Appends a result record to results/<name>.jsonl."""
+    os.makedirs(RESULTS, exist_ok=True)
+    path = os.path.join(RESULTS, name + '.jsonl')
+    with open(path, 'a') as file:
+        file.write(json.dumps(result) + '\n')
+    print("Appended to " + path)
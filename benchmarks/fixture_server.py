@@ -0,0 +1,279 @@
+"""
+Local LinkedIn-like fixture server for offline benchmarks.
+
+Serves the markup the scraper relies on: the job list
+(ul.scaffold-layout__list-container with data-occludable-job-id items),
+the next page button (jobs-search-pagination__button--next), the
+"Show qualification details" button and the skill match modal
+(job-details-skill-match-modal__content), plus a minimal login page.
+
+Latency and failures are injected per request, and the skills of every
+job are generated deterministically so the extraction can be checked.
+
+Usage (standalone, to point linkedin_url to it by hand):
+    python benchmarks/fixture_server.py --port 8000 --jobs 100 --latency 0.05
+"""
+import time
+import random
+import argparse
+import threading
+
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+FIRST_JOB_ID = 4000000000
+
+# Skills of the generated jobs, picked with a skewed distribution
+SKILLS = [
+    'Python', 'SQL', 'Java', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'C++', 'C#', 'Scala',
+    'Kotlin', 'Ruby', 'PHP', 'Bash', 'Linux', 'Docker', 'Kubernetes', 'Terraform', 'Ansible',
+    'Amazon Web Services (AWS)', 'Microsoft Azure', 'Google Cloud Platform (GCP)', 'Git',
+    'CI/CD', 'Jenkins', 'GitHub Actions', 'REST APIs', 'GraphQL', 'gRPC', 'Microservices',
+    'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Kafka', 'RabbitMQ', 'Elasticsearch', 'Spark',
+    'Hadoop', 'Airflow', 'dbt', 'Snowflake', 'Pandas', 'NumPy', 'Machine Learning',
+    'Deep Learning', 'PyTorch', 'TensorFlow', 'Scikit-Learn', 'Data Analysis', 'Statistics',
+    'Tableau', 'Power BI', 'Excel', 'Agile Methodologies', 'Scrum', 'Jira', 'Communication',
+    'Leadership', 'Project Management', 'Problem Solving', 'Teamwork', 'English',
+    'System Design', 'Distributed Systems', 'Networking', 'Security', 'OAuth', 'React',
+    'Angular', 'Vue.js', 'Node.js', 'Django', 'Flask', 'FastAPI', 'Spring Boot', 'HTML',
+    'CSS', 'Figma', 'Unit Testing', 'Test Automation', 'Selenium', 'Observability',
+    'Prometheus', 'Grafana', 'Site Reliability Engineering (SRE)', 'Data Modeling', 'ETL',
+]
+
+LIST_PAGE = """<!DOCTYPE html>
+<html><head><title>Jobs</title></head><body>
+<div class="jobs-search-results-list">
+<ul class="scaffold-layout__list-container">
+{items}
+</ul>
+{next_button}
+</div>
+</body></html>"""
+
+NEXT_BUTTON = """<button class="jobs-search-pagination__button--next" onclick="location.href='{url}'">Next</button>"""
+
+JOB_PAGE = """<!DOCTYPE html>
+<html><head><title>Job {job_id}</title></head><body>
+<h1>Job {job_id}</h1>
+{button}
+<div id="modal-root">{modal}</div>
+<script>
+const skills = {skills_js};
+function openModal() {{
+    setTimeout(function () {{
+        if (document.querySelector('.job-details-skill-match-modal__content')) {{
+            document.querySelector('.job-details-skill-match-modal__content').style.display = 'block';
+            return;
+        }}
+        const modal = document.createElement('div');
+        modal.className = 'artdeco-modal job-details-skill-match-modal__content';
+        const list = document.createElement('ul');
+        modal.appendChild(list);
+        document.getElementById('modal-root').appendChild(modal);
+        // Items are rendered in small batches, like the real modal
+        let i = 0;
+        (function render() {{
+            for (let n = 0; n < 4 && i < skills.length; n++, i++) {{
+                const li = document.createElement('li');
+                const icon = document.createElement('div');
+                const name = document.createElement('div');
+                name.innerText = skills[i];
+                li.appendChild(icon);
+                li.appendChild(name);
+                list.appendChild(li);
+            }}
+            if (i < skills.length) setTimeout(render, {render_ms});
+        }})();
+    }}, {modal_ms});
+}}
+</script>
+</body></html>"""
+
+DETAILS_BUTTON = """<button class="artdeco-button" onclick="openModal()"><span class="artdeco-button__text">Show qualification details</span></button>"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Login</title></head><body>
+<form method="post" action="/login">
+<input id="username" name="username"><input id="password" name="password" type="password">
+<button type="submit">Sign in</button>
+</form>
+</body></html>"""
+
+class FixtureConfig:
+    """Size, latency and failure injection settings of the fixture site."""
+
+    def __init__(self, jobs=100, page_size=25, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 missing_rate=0.0, modal_delay=0.1, render_delay=0.02, skills_per_job=(5, 15),
+                 inline_modal=False, seed=0):
+        self.jobs = jobs
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.missing_rate = missing_rate
+        self.modal_delay = modal_delay
+        self.render_delay = render_delay
+        self.skills_per_job = skills_per_job
+        self.inline_modal = inline_modal
+        self.seed = seed
+
+    @property
+    def job_ids(self):
+        return [str(FIRST_JOB_ID + i) for i in range(self.jobs)]
+
+    def job_skills(self, job_id):
+        """Returns the skills served for a job, the same on every request."""
+        rng = random.Random(f"{self.seed}:{job_id}")
+        # Skew the picks towards the first skills, so the ranking is not flat
+        weights = [1 / (rank + 1) for rank in range(len(SKILLS))]
+        count = rng.randint(*self.skills_per_job)
+        picked = []
+        while len(picked) < min(count, len(SKILLS)):
+            skill = rng.choices(SKILLS, weights)[0]
+            if skill not in picked:
+                picked.append(skill)
+        return picked
+
+    def has_details(self, job_id):
+        """Jobs without the qualification button, decided once per job."""
+        return random.Random(f"{self.seed}:missing:{job_id}").random() >= self.missing_rate
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.count('requests')
+        self._delay()
+        if url.path.startswith('/jobs/view/'):
+            self._job_page(url.path.rstrip('/').rsplit('/', 1)[-1])
+        elif url.path.startswith('/jobs/'):
+            self._list_page(url)
+        elif url.path == '/login':
+            self._send(200, LOGIN_PAGE)
+        else:
+            self._send(200, "<!DOCTYPE html><html><body><h1>Feed</h1></body></html>")
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        self.server.count('logins')
+        self.send_response(303)
+        self.send_header('Location', '/feed/')
+        self.send_header('Set-Cookie', 'li_at=fixture; Path=/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _delay(self):
+        if self.config.latency or self.config.jitter:
+            time.sleep(max(0.0, random.gauss(self.config.latency, self.config.jitter)))
+
+    def _list_page(self, url):
+        query = parse_qs(url.query)
+        try:
+            # Offset of the first job, like LinkedIn's start= parameter
+            start = max(int(query.get('start', ['0'])[0]), 0)
+        except ValueError:
+            start = 0
+        job_ids = self.config.job_ids[start:start + self.config.page_size]
+        items = '\n'.join(f'<li data-occludable-job-id="{job_id}">Job {job_id}</li>' for job_id in job_ids)
+        next_button = ''
+        if start + self.config.page_size < self.config.jobs:
+            query['start'] = [str(start + self.config.page_size)]
+            next_url = url.path + '?' + urlencode(query, doseq=True)
+            next_button = NEXT_BUTTON.format(url=escape(next_url))
+        self.server.count('list_pages')
+        self._send(200, LIST_PAGE.format(items=items, next_button=next_button))
+
+    def _job_page(self, job_id):
+        if random.random() < self.config.failure_rate:
+            self.server.count('failures')
+            self._send(500, "<!DOCTYPE html><html><body><h1>Something went wrong</h1></body></html>")
+            return
+        if not job_id.isdigit() or not (0 <= int(job_id) - FIRST_JOB_ID < self.config.jobs):
+            self._send(404, "<!DOCTYPE html><html><body><h1>Not found</h1></body></html>")
+            return
+        skills = self.config.job_skills(job_id)
+        details = self.config.has_details(job_id)
+        modal = ''
+        if self.config.inline_modal and details:
+            # Hidden modal markup, parsed by the HTTP fast path
+            items = ''.join(f'<li><div></div><div>{escape(skill)}</div></li>' for skill in skills)
+            modal = ('<div class="artdeco-modal job-details-skill-match-modal__content" style="display:none">'
+                     f'<ul>{items}</ul></div>')
+        self.server.count('job_pages')
+        self._send(200, JOB_PAGE.format(
+            job_id=job_id,
+            button=DETAILS_BUTTON if details else '',
+            modal=modal,
+            skills_js='[' + ','.join('"' + skill.replace('"', '\\"') + '"' for skill in skills) + ']',
+            modal_ms=int(self.config.modal_delay * 1000),
+            render_ms=int(self.config.render_delay * 1000),
+        ))
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config, host='127.0.0.1', port=0):
+        super().__init__((host, port), FixtureHandler)
+        self.config = config
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search_url(self, keywords='fixture'):
+        return self.url + '/jobs/search/?' + urlencode({'keywords': keywords, 'geoId': '0'})
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+def start_server(config, host='127.0.0.1', port=0):
+    """Starts the fixture server in a background thread and returns it."""
+    server = FixtureServer(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="LinkedIn-like fixture server for offline benchmarks")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.0, help="mean response delay in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="standard deviation of the delay")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of job pages answered with 500")
+    parser.add_argument('--missing-rate', type=float, default=0.0, help="share of jobs without qualification details")
+    parser.add_argument('--inline-modal', action='store_true', help="include the modal markup for the HTTP fast path")
+    args = parser.parse_args()
+    config = FixtureConfig(jobs=args.jobs, page_size=args.page_size, latency=args.latency, jitter=args.jitter,
+                           failure_rate=args.failure_rate, missing_rate=args.missing_rate,
+                           inline_modal=args.inline_modal)
+    server = FixtureServer(config, port=args.port)
+    print(f"Serving on {server.url}, search URL: {server.search_url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from vars import stopwords, ext_folder
+from files import list_files_in_directory, state_path, filename_timestamp
+from process import (
+    read_journal, canonical_skill_id, canonical_name, canonical_signature, save_skill_memo, stopword_filter
+)
+
+MATRIX_FILE = 'matrix.npz'
+
+class Vocabulary:
+    """Interns strings to consecutive integer IDs."""
+
+    def __init__(self, items=()):
+        self.ids = {}
+        self.items = []
+        for item in items:
+            self.intern(item)
+
+    def intern(self, item):
+        """Returns the ID of item, adding it to the vocabulary if needed."""
+        item_id = self.ids.get(item)
+        if item_id is None:
+            item_id = self.ids[item] = len(self.items)
+            self.items.append(item)
+        return item_id
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, item_id):
+        return self.items[item_id]
+
+class SkillMatrix:
+    """
+    Sparse job x skill incidence matrix in CSR layout.
+
+    Row i holds the skill IDs of job i in indices[indptr[i]:indptr[i + 1]].
+    Every job also keeps its search (interned) and extraction timestamp, so
+    counts can be filtered by search or date with vectorized masks.
+    """
+
+    def __init__(self, skills, indptr, indices, job_ids, searches, search_codes, timestamps):
+        self.skills = skills
+        self.indptr = indptr
+        self.indices = indices
+        self.job_ids = job_ids
+        self.searches = searches
+        self.search_codes = search_codes
+        self.timestamps = timestamps
+
+    @property
+    def n_jobs(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_skills(self):
+        return len(self.skills)
+
+    @classmethod
+    def from_records(cls, records, stopwords=stopwords):
+        """Builds the matrix from job records; a (canonical) skill is counted once per job."""
+        skills = Vocabulary()
+        searches = Vocabulary()
+        indptr = [0]
+        indices = []
+        job_ids = []
+        search_codes = []
+        timestamps = []
+        is_stopword = stopword_filter(stopwords)
+        for record in records:
+            row = set()
+            for skill in record.get('skills') or []:
+                skill_id = canonical_skill_id(skill)
+                if skill_id is not None and not is_stopword(canonical_name(skill_id)):
+                    row.add(skills.intern(skill_id))
+            if not row:
+                continue
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+            job_ids.append(record.get('job_id') or '')
+            search_codes.append(searches.intern(record.get('search_url') or ''))
+            timestamps.append(record.get('timestamp') or 'NaT')
+        save_skill_memo()
+        return cls(
+            Vocabulary(canonical_name(skill_id) for skill_id in skills.items),
+            np.array(indptr, dtype=np.int64),
+            np.array(indices, dtype=np.int32),
+            np.array(job_ids, dtype=str),
+            searches,
+            np.array(search_codes, dtype=np.int32),
+            np.array(timestamps, dtype='datetime64[s]'),
+        )
+
+    @classmethod
+    def from_files(cls, files, stopwords=stopwords):
+        """Builds the matrix from extraction files, dating legacy records by their file name."""
+        def records():
+            for file_path in files:
+                fallback = filename_timestamp(file_path)
+                for record in read_journal(file_path):
+                    if not record.get('timestamp') and fallback:
+                        record['timestamp'] = fallback
+                    yield record
+        return cls.from_records(records(), stopwords)
+
+    def save(self, path, signature=''):
+        """Serializes the matrix to a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            skills=np.array(self.skills.items, dtype=str),
+            indptr=self.indptr,
+            indices=self.indices,
+            job_ids=self.job_ids,
+            searches=np.array(self.searches.items, dtype=str),
+            search_codes=self.search_codes,
+            timestamps=self.timestamps,
+            signature=np.array(signature),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Loads a matrix saved with save(); returns (matrix, signature)."""
+        with np.load(path) as data:
+            matrix = cls(
+                Vocabulary(data['skills'].tolist()),
+                data['indptr'],
+                data['indices'],
+                data['job_ids'],
+                Vocabulary(data['searches'].tolist()),
+                data['search_codes'],
+                data['timestamps'],
+            )
+            return matrix, str(data['signature'])
+
+    def rows(self):
+        """Returns the row (job) index of every stored entry."""
+        return np.repeat(np.arange(self.n_jobs), np.diff(self.indptr))
+
+    def mask(self, search=None, since=None):
+        """
+        Selects jobs by search and extraction date.
+
+        Args:
+            search (str): Case-insensitive substring of the search URL (e.g. a keyword).
+            since (str or datetime): Only jobs extracted at or after this time.
+
+        Returns:
+            np.ndarray: Boolean mask over the jobs.
+        """
+        selected = np.ones(self.n_jobs, dtype=bool)
+        if search is not None:
+            wanted = [code for code, url in enumerate(self.searches.items) if search.lower() in url.lower()]
+            selected &= np.isin(self.search_codes, wanted)
+        if since is not None:
+            selected &= self.timestamps >= np.datetime64(since, 's')
+        return selected
+
+    def skill_counts(self, mask=None):
+        """Returns the number of (selected) jobs listing each skill."""
+        if mask is None:
+            indices = self.indices
+        else:
+            indices = self.indices[mask[self.rows()]]
+        return np.bincount(indices, minlength=self.n_skills)
+
+    def top_k(self, k=None, mask=None):
+        """
+        Returns the k most frequent skills as a Skill/Count/Percentage DataFrame.
+
+        Returns:
+            tuple: (DataFrame, number of selected jobs), like process_all_skills.
+        """
+        counts = self.skill_counts(mask)
+        jobtotal = int(self.n_jobs if mask is None else mask.sum())
+        present = np.flatnonzero(counts)
+        order = present[np.argsort(-counts[present], kind='stable')]
+        if k is not None:
+            order = order[:k]
+        skills = np.array(self.skills.items, dtype=object)
+        df = pd.DataFrame({'Skill': skills[order], 'Count': counts[order]})
+        df['Percentage'] = np.round(df['Count'] / max(jobtotal, 1) * 100).astype(int)
+        return df, jobtotal
+
+def files_signature(files):
+    """Identifies a set of extraction files by name, size and mtime."""
+    parts = []
+    for file_path in sorted(files):
+        stat = os.stat(file_path)
+        parts.append(f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return '|'.join(parts)
+
+def load_corpus_matrix(files=None):
+    """Returns the matrix of all extraction files, reusing the saved .npz while the files are unchanged."""
+    if files is None:
+        files = list_files_in_directory(ext_folder)
+    signature = (files_signature(files) + '|stopwords:' + ','.join(sorted(stopwords))
+                 + '|canonical:' + canonical_signature())
+    path = state_path(MATRIX_FILE)
+    if os.path.exists(path):
+        try:
+            matrix, saved = SkillMatrix.load(path)
+            if saved == signature:
+                logging.info(f"Skill matrix loaded: {matrix.n_jobs} job(s), {matrix.n_skills} skill(s)")
+                return matrix
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Rebuilding unreadable skill matrix: {e}")
+    matrix = SkillMatrix.from_files(files)
+    matrix.save(path, signature)
+    logging.info(f"Skill matrix built: {matrix.n_jobs} job(s), {matrix.n_skills} skill(s)")
+    return matrix
+
+def cooccurrence(matrix, top=200, mask=None, chunk=4096):
+    """
+    Counts how many jobs list each pair of the top skills.
+
+    Rows are densified in chunks over the top skills only, and the counts
+    accumulate as X.T @ X, so memory stays at chunk x top.
+
+    Returns:
+        tuple: (skill IDs of the top skills, top x top co-occurrence matrix, selected jobs)
+    """
+    counts = matrix.skill_counts(mask)
+    present = np.flatnonzero(counts)
+    top_ids = present[np.argsort(-counts[present], kind='stable')][:top]
+    position = np.full(matrix.n_skills, -1, dtype=np.int64)
+    position[top_ids] = np.arange(len(top_ids))
+
+    rows = matrix.rows()
+    keep = position[matrix.indices] >= 0
+    if mask is not None:
+        keep &= mask[rows]
+    rows = rows[keep]
+    cols = position[matrix.indices[keep]]
+
+    together = np.zeros((len(top_ids), len(top_ids)), dtype=np.float64)
+    # Entries are sorted by row, so each chunk of rows is a contiguous slice
+    bounds = np.searchsorted(rows, np.arange(0, matrix.n_jobs + chunk, chunk))
+    for start, (lo, hi) in zip(range(0, matrix.n_jobs, chunk), zip(bounds[:-1], bounds[1:])):
+        if lo == hi:
+            continue
+        dense = np.zeros((chunk, len(top_ids)), dtype=np.float32)
+        dense[rows[lo:hi] - start, cols[lo:hi]] = 1
+        together += dense.T @ dense
+    jobtotal = int(matrix.n_jobs if mask is None else mask.sum())
+    return top_ids, together.astype(np.int64), jobtotal
+
+def skill_pairs(matrix, top=200, min_together=2, mask=None):
+    """
+    Returns the pairs of top skills that appear together, with lift and PMI.
+
+    Lift is P(a, b) / (P(a) P(b)); PMI is its log2. Values above 1 (PMI > 0)
+    mean the skills are asked together more often than by chance.
+    """
+    top_ids, together, jobtotal = cooccurrence(matrix, top, mask)
+    counts = np.diag(together).astype(np.float64)
+    first, second = np.triu_indices(len(top_ids), k=1)
+    pairs = together[first, second]
+    keep = pairs >= min_together
+    first, second, pairs = first[keep], second[keep], pairs[keep]
+    lift = pairs * max(jobtotal, 1) / (counts[first] * counts[second])
+    skills = np.array(matrix.skills.items, dtype=object)
+    df = pd.DataFrame({
+        'Skill A': skills[top_ids[first]],
+        'Skill B': skills[top_ids[second]],
+        'Together': pairs,
+        'Percentage': np.round(pairs / max(jobtotal, 1) * 100).astype(int),
+        'Lift': np.round(lift, 2),
+        'PMI': np.round(np.log2(lift), 2),
+    })
+    df = df.sort_values(by=['Together', 'Lift'], ascending=False)
+    return df.reset_index(drop=True)
+
+def best_skill_set(matrix, size=100, mask=None):
+    """
+    Greedily picks the skills that cover the most jobs (a job is covered by any of its skills).
+
+    Each step is a bincount over the entries of the still uncovered jobs.
+
+    Returns:
+        pd.DataFrame: Rank, Skill, jobs newly covered and cumulative coverage percentage.
+    """
+    rows = matrix.rows()
+    covered = np.zeros(matrix.n_jobs, dtype=bool) if mask is None else ~mask
+    jobtotal = int(matrix.n_jobs - covered.sum())
+    picked = []
+    gained = []
+    for _ in range(size):
+        gains = np.bincount(matrix.indices[~covered[rows]], minlength=matrix.n_skills)
+        skill_id = int(np.argmax(gains))
+        if gains[skill_id] == 0:
+            break
+        covered[rows[matrix.indices == skill_id]] = True
+        picked.append(skill_id)
+        gained.append(int(gains[skill_id]))
+    cumulative = np.cumsum(gained)
+    skills = np.array(matrix.skills.items, dtype=object)
+    return pd.DataFrame({
+        'Rank': np.arange(1, len(picked) + 1),
+        'Skill': skills[picked] if picked else [],
+        'New jobs': gained,
+        'Coverage': np.round(cumulative / max(jobtotal, 1) * 100).astype(int) if picked else [],
+    })
@@ -0,0 +1,78 @@
+import logging
+
+import vars
+from selenium.common.exceptions import WebDriverException
+
+from utils import initiate_browser, handle_login, quit_browser
+from pool import open_worker_browsers
+
+# Browsers kept alive between menu iterations
+_warm = {'main': None, 'workers': []}
+
+def is_alive(browser):
+    """Checks whether the browser session still responds."""
+    try:
+        browser.current_url
+        return True
+    except WebDriverException:
+        return False
+
+def get_browser(cookies_file):
+    """Returns the logged in main browser, reusing the warm one when it is still alive."""
+    browser = _warm['main']
+    if browser is not None and is_alive(browser):
+        logging.info("Reusing warm browser session")
+        return browser
+    browser = initiate_browser()
+    if browser is None:
+        return None
+    handle_login(browser, cookies_file)
+    if getattr(vars, 'keep_browser_warm', True):
+        _warm['main'] = browser
+    return browser
+
+def release_browser(browser):
+    """Quits the main browser after an extraction unless it is kept warm."""
+    if browser is not None and _warm['main'] is not browser:
+        quit_safely(browser)
+
+def acquire_workers(count, cookies_file):
+    """Returns count logged in worker browsers, reusing warm ones first."""
+    workers = []
+    while _warm['workers'] and len(workers) < count:
+        browser = _warm['workers'].pop()
+        if is_alive(browser):
+            workers.append(browser)
+        else:
+            quit_safely(browser)
+    if workers:
+        logging.info(f"Reusing {len(workers)} warm worker browser(s)")
+    return workers + open_worker_browsers(count - len(workers), cookies_file)
+
+def release_workers(workers):
+    """Keeps the worker browsers warm for the next extraction, or quits them."""
+    for browser in workers:
+        if getattr(vars, 'keep_browser_warm', True) and is_alive(browser):
+            _warm['workers'].append(browser)
+        else:
+            quit_safely(browser)
+
+def discard_browser(browser):
+    """Quits a browser that is no longer usable and forgets it."""
+    if _warm['main'] is browser:
+        _warm['main'] = None
+    quit_safely(browser)
+
+def close_all():
+    """Quits every warm browser."""
+    for browser in [_warm['main']] + _warm['workers']:
+        if browser is not None:
+            quit_safely(browser)
+    _warm['main'] = None
+    _warm['workers'] = []
+
+def quit_safely(browser):
+    try:
+        quit_browser(browser)
+    except WebDriverException:
+        pass
@@ -0,0 +1,73 @@
+import os
+import pickle
+import hashlib
+import logging
+
+from files import state_path
+
+CACHE_FILE = 'aggregates.pickle'
+CACHE_VERSION = 3
+
+def load_cache(signature):
+    """Loads the per-file partial aggregates, keyed by file name, if they were counted with the same canonical skills."""
+    path = state_path(CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'rb') as file:
+            cache = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        logging.warning(f"Ignoring unreadable processed cache: {e}")
+        return {}
+    if cache.get('version') != CACHE_VERSION or cache.get('canonical') != signature:
+        return {}
+    return cache['files']
+
+def save_cache(entries, signature):
+    """Writes the per-file partial aggregates atomically."""
+    path = state_path(CACHE_FILE)
+    with open(path + '.tmp', 'wb') as file:
+        pickle.dump({'version': CACHE_VERSION, 'canonical': signature, 'files': entries}, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+def file_digest(file_path):
+    """Returns the SHA-1 of the file content."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def lookup(cache, file_path):
+    """
+    Returns the cached entry of a file if it is still valid.
+
+    Size and mtime are checked first; when they changed the content hash
+    decides, so a touched but unchanged file is not parsed again.
+
+    Returns:
+        tuple: (entry or None, True if the entry was refreshed and the cache should be saved)
+    """
+    entry = cache.get(os.path.basename(file_path))
+    if entry is None:
+        return None, False
+    stat = os.stat(file_path)
+    if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+        return entry, False
+    if entry['size'] == stat.st_size and entry['sha1'] == file_digest(file_path):
+        entry['mtime'] = stat.st_mtime_ns
+        return entry, True
+    return None, False
+
+def new_entry(file_path, id_counts, jobtotal, records, errors):
+    """Builds the cache entry of a freshly parsed file."""
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha1': file_digest(file_path),
+        'counts': dict(id_counts),
+        'jobtotal': jobtotal,
+        'records': records,
+        'errors': errors,
+    }
@@ -0,0 +1,251 @@
+import os
+import re
+import math
+import time
+import pickle
+import logging
+import unicodedata
+
+from files import state_path
+
+MEMO_FILE = 'canonical.pickle'
+MEMO_VERSION = 2
+# Inner part of "Name (INNER)" treated as an abbreviation of the name
+ACRONYM = re.compile(r'^[A-Z][A-Z0-9&+.]{1,7}$')
+PARENTHESIS = re.compile(r'^(.+?)\s*\(([^()]+)\)$')
+
+def skill_key(skill):
+    """Comparison key of a skill: lowercase, without accents, separators and extra spaces."""
+    skill = unicodedata.normalize('NFKD', skill)
+    skill = ''.join(char for char in skill if not unicodedata.combining(char)).lower()
+    return ' '.join(re.sub(r'[-_/,;:]+', ' ', skill).split())
+
+def compact_key(key):
+    """Key without spaces and dots, so "Node.js"/"NodeJS" and "Postgre SQL"/"PostgreSQL" meet."""
+    return re.sub(r'[\s.]+', '', key)
+
+def trigrams(key):
+    """Character trigrams of a key, padded so short words and word starts count."""
+    padded = '  ' + key + ' '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def dice(first, second):
+    return 2 * len(first & second) / (len(first) + len(second))
+
+def read_aliases(path):
+    """
+    Reads the user alias file: one "Canonical name = alias, alias" line per skill.
+
+    Returns:
+        list: (canonical name, [aliases]) pairs, in file order.
+    """
+    aliases = []
+    if not path or not os.path.exists(path):
+        return aliases
+    with open(path, 'r') as file:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, _, others = line.partition('=')
+            name = ' '.join(name.split())
+            if not name:
+                logging.warning(f"Skipping alias line {number} without a canonical name")
+                continue
+            aliases.append((name, [' '.join(alias.split()) for alias in others.split(',') if alias.strip()]))
+    return aliases
+
+class Canonicalizer:
+    """
+    Maps raw skill strings to canonical skills.
+
+    A raw string is resolved in this order: the user aliases, the exact
+    comparison key (case, accents, separators; then also spaces and dots),
+    the parts of "Name (ABBR)"/"Name (qualifier)" forms, and finally a
+    near-duplicate search. The search uses a trigram index with prefix filtering: only the
+    keys sharing one of the rarest trigrams of the string are compared, so
+    the cost does not grow with the square of the vocabulary.
+
+    Every raw string is memoized with its canonical ID, so a re-run only
+    resolves the strings it has not seen yet. IDs are only meaningful for
+    the memo that assigned them, which created identifies.
+    """
+
+    def __init__(self, aliases=(), threshold=0.82, signature=''):
+        self.threshold = threshold
+        self.signature = signature
+        self.created = time.time_ns()
+        self.names = []
+        self.keys = []
+        self.key_ids = {}
+        self.memo = {}
+        self.compact_ids = {}
+        self.grams = []
+        self.postings = {}
+        # A new memo is saved once, so the IDs cached with it stay valid
+        self.dirty = True
+        for name, others in aliases:
+            cid = self._resolve_exact(name)
+            if cid is None:
+                cid = self._new_cluster(name)
+            self.names[cid] = name
+            self._add_parts(name, cid)
+            for alias in others:
+                self._add_key(skill_key(alias), cid)
+
+    def canonical_id(self, raw):
+        """Returns the canonical ID of a raw skill string."""
+        cid = self.memo.get(raw)
+        if cid is None:
+            skill = ' '.join(raw.split())
+            cid = self._resolve(skill) if skill else -1
+            self.memo[raw] = cid
+            self.dirty = True
+        return cid
+
+    def canonical(self, raw):
+        """Returns the canonical name of a raw skill string ('' for a blank one)."""
+        cid = self.canonical_id(raw)
+        return self.names[cid] if cid >= 0 else ''
+
+    def _resolve(self, skill):
+        cid = self._resolve_exact(skill)
+        if cid is not None:
+            self._prefer_name(cid, skill)
+            return cid
+        match = PARENTHESIS.match(skill)
+        if match:
+            base, inner = match.groups()
+            cid = self._resolve_exact(base)
+            if cid is None and ACRONYM.match(inner):
+                cid = self.key_ids.get(skill_key(inner))
+            if cid is None:
+                cid = self._fuzzy(skill_key(skill))
+            if cid is None:
+                cid = self._fuzzy(skill_key(base))
+            if cid is None:
+                cid = self._new_cluster(skill)
+            self._add_parts(skill, cid)
+            return cid
+        key = skill_key(skill)
+        cid = self._fuzzy(key)
+        if cid is None:
+            return self._new_cluster(skill)
+        self._add_key(key, cid)
+        return cid
+
+    def _add_parts(self, skill, cid):
+        """Registers "Name (ABBR)" under its own key, "Name" and "ABBR", so later forms join it."""
+        self._add_key(skill_key(skill), cid)
+        match = PARENTHESIS.match(skill)
+        if match:
+            base, inner = match.groups()
+            self._add_key(skill_key(base), cid)
+            if ACRONYM.match(inner):
+                self._add_key(skill_key(inner), cid)
+
+    def _resolve_exact(self, skill):
+        key = skill_key(skill)
+        cid = self.key_ids.get(key)
+        if cid is None:
+            cid = self.compact_ids.get(compact_key(key))
+        return cid
+
+    def _prefer_name(self, cid, skill):
+        """Keeps a capitalized spelling over an all-lowercase one."""
+        name = self.names[cid]
+        if name == name.lower() and skill != skill.lower():
+            self.names[cid] = skill
+
+    def _new_cluster(self, skill):
+        cid = len(self.names)
+        self.names.append(skill)
+        self._add_key(skill_key(skill), cid)
+        return cid
+
+    def _add_key(self, key, cid):
+        if not key or key in self.key_ids:
+            return
+        self.key_ids[key] = cid
+        self._index(key)
+
+    def _index(self, key):
+        pos = len(self.keys)
+        self.keys.append(key)
+        self.compact_ids.setdefault(compact_key(key), self.key_ids[key])
+        grams = trigrams(key)
+        self.grams.append(grams)
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(pos)
+
+    def _fuzzy(self, key):
+        """Returns the cluster of the most similar indexed key, if similar enough."""
+        if len(key) < 5:
+            # Too short to tell a typo from another skill (e.g. AWS and AWT)
+            return None
+        grams = trigrams(key)
+        digits = set(re.findall(r'\d+', key))
+        t = self.threshold
+        # A match shares at least this many trigrams, so it must contain one
+        # of the len(grams) - overlap + 1 rarest ones (prefix filtering)
+        overlap = math.ceil(t * len(grams) / (2 - t))
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(grams) - overlap + 1]:
+            candidates.update(self.postings.get(gram, ()))
+        best, best_score = None, t
+        for pos in candidates:
+            other = self.grams[pos]
+            if not overlap <= len(other) <= len(grams) * (2 - t) / t:
+                continue
+            score = dice(grams, other)
+            # Versions are different skills (Python 2 / Python 3)
+            if score >= best_score and set(re.findall(r'\d+', self.keys[pos])) == digits:
+                best, best_score = pos, score
+        return None if best is None else self.key_ids[self.keys[best]]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The trigram index is rebuilt from the keys on load
+        del state['compact_ids'], state['grams'], state['postings'], state['dirty']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.compact_ids = {}
+        self.grams = []
+        self.postings = {}
+        self.dirty = False
+        keys, self.keys = self.keys, []
+        for key in keys:
+            self._index(key)
+
+def load_canonicalizer(aliases_file, threshold):
+    """Loads the saved memo, or starts a new one when the alias file or threshold changed."""
+    signature = 'exact'
+    if aliases_file and os.path.exists(aliases_file):
+        stat = os.stat(aliases_file)
+        signature = f"{os.path.abspath(aliases_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+    signature += f"|{threshold}"
+    path = state_path(MEMO_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as file:
+                state = pickle.load(file)
+            if state.get('version') == MEMO_VERSION and state['canonicalizer'].signature == signature:
+                return state['canonicalizer']
+            logging.info("Skill aliases changed, canonicalizing all skills again")
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError) as e:
+            logging.warning(f"Rebuilding unreadable skill memo: {e}")
+    return Canonicalizer(read_aliases(aliases_file), threshold, signature)
+
+def save_canonicalizer(canonicalizer):
+    """Writes the memo atomically, if new strings were canonicalized."""
+    if not canonicalizer.dirty:
+        return
+    path = state_path(MEMO_FILE)
+    with open(path + '.tmp', 'wb') as file:
+        pickle.dump({'version': MEMO_VERSION, 'canonicalizer': canonicalizer}, file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    canonicalizer.dirty = False
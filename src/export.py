@@ -0,0 +1,88 @@
+import logging
+import importlib.util
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from files import set_excelname
+
+# Number format of the Skill, Count and Percentage columns
+FORMATS = ('@', '0', '0%')
+
+def set_exportname(url, extension):
+    """Returns the export file name for the given format."""
+    return set_excelname(url)[:-len('.xlsx')] + '.' + extension
+
+def save_to_excel(df, url, numjobs, extra_sheets=None):
+    """
+    Writes the skills DataFrame (and extra sheets) to XLSX in one streaming pass.
+
+    The workbook is opened in write-only mode: the job count, header, rows
+    and number formats are written sequentially and the input is not modified.
+    """
+    file_name = set_exportname(url, 'xlsx')
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append([f"Number of jobs: {numjobs}"])
+    ws.append(list(df.columns))
+    percentage = list(df.columns).index('Percentage') if 'Percentage' in df.columns else None
+    for row in df.itertuples(index=False, name=None):
+        cells = []
+        for pos, value in enumerate(row):
+            if pos == percentage:
+                value = value / 100
+            cell = WriteOnlyCell(ws, value=_plain(value))
+            if pos < len(FORMATS):
+                cell.number_format = FORMATS[pos]
+            cells.append(cell)
+        ws.append(cells)
+
+    for sheet_name, sheet_df in (extra_sheets or {}).items():
+        sheet = wb.create_sheet(sheet_name)
+        sheet.append(list(sheet_df.columns))
+        for row in sheet_df.itertuples(index=False, name=None):
+            sheet.append([_plain(value) for value in row])
+
+    wb.save(file_name)
+    logging.info("Exported to " + file_name)
+    return file_name
+
+def save_to_csv(df, url, numjobs):
+    """Writes the DataFrame to plain CSV, with the number of jobs in an extra Jobs column."""
+    file_name = set_exportname(url, 'csv')
+    df.assign(Jobs=numjobs).to_csv(file_name, index=False)
+    logging.info("Exported to " + file_name)
+    return file_name
+
+def parquet_available():
+    """Checks whether pandas has a Parquet engine (pyarrow or fastparquet) to write with."""
+    return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+
+def save_to_parquet(df, url, numjobs):
+    """Writes the DataFrame to Parquet (requires pyarrow), keeping the number of jobs as metadata."""
+    file_name = set_exportname(url, 'parquet')
+    out = df.copy(deep=False)
+    out.attrs['numjobs'] = numjobs
+    try:
+        out.to_parquet(file_name, index=False)
+    except ImportError as e:
+        logging.error(f"Parquet export needs pyarrow: {e}")
+        raise
+    logging.info("Exported to " + file_name)
+    return file_name
+
+def export(df, url, numjobs, fmt='xlsx', extra_sheets=None):
+    """Exports to the chosen format: xlsx, csv or parquet (extra sheets only apply to xlsx)."""
+    if fmt == 'csv':
+        return save_to_csv(df, url, numjobs)
+    if fmt == 'parquet':
+        return save_to_parquet(df, url, numjobs)
+    return save_to_excel(df, url, numjobs, extra_sheets)
+
+def _plain(value):
+    """Converts NumPy scalars and NaN to Python values openpyxl can write."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
@@ -1,5 +1,9 @@
 import time
 import logging
+import threading
+
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from concurrent.futures import ThreadPoolExecutor
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -10,12 +14,52 @@ from selenium.common.exceptions import (
     ElementClickInterceptedException, WebDriverException, NoSuchWindowException
 )
 
-from utils import set_filename, file_save
-from navigation import navigate_to_jobs, wait_for_page_load
+import vars
+from vars import ext_folder
+from files import set_filename, file_save, new_job_record
+from jobindex import (
+    load_job_index, index_jobs, is_fresh, save_run_state, clear_run_state, journal_job_ids
+)
+from navigation import navigate_to_jobs, wait_for_page_load, load_page, site_url
+from pool import run_jobs
+from browser import acquire_workers, release_workers
+from fetch import new_session, fetch_job_skills, fetch_job_ids
+from waits import stage_timeout, record_latency, record_timeout, wait_for_stable_count
+from metrics import profiler
+from scheduler import scheduler
+from storage import sqlite_enabled, connect, insert_records
+
+# Single round trip readers, returning arrays from the page
+JOB_IDS_SCRIPT = """
+return Array.from(
+    document.querySelectorAll('ul.scaffold-layout__list-container li'),
+    li => li.getAttribute('data-occludable-job-id')
+).filter(Boolean);
+"""
+SKILL_COUNT_SCRIPT = """
+return document.querySelectorAll("div[class*='job-details-skill-match-modal__content'] li").length;
+"""
+SKILLS_SCRIPT = """
+const modal = "//div[contains(@class, 'job-details-skill-match-modal__content')]//li";
+const items = document.evaluate(modal, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const skills = [];
+for (let i = 0; i < items.snapshotLength; i++) {
+    const div = document.evaluate('.//div[2]', items.snapshotItem(i), null,
+                                  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    skills.push(div ? div.innerText : null);
+}
+return skills;
+"""
+
+def offset_pagination():
+    """Checks whether result pages are opened by their start= offset instead of clicking Next."""
+    return getattr(vars, 'pagination', 'click') == 'offset'
 
 def extract_jobs(browser, job_url):
-    """Extracts job IDs from the provided URL."""
+    """Extracts job IDs from the provided URL, by clicking Next or by page offset."""
     try:
+        if offset_pagination():
+            return extract_job_ids_by_offset([browser], job_url)
         navigate_to_jobs(browser, job_url)
         job_ids = extract_job_ids(browser)
         return job_ids
@@ -23,120 +67,599 @@ def extract_jobs(browser, job_url):
         logging.error("Error during job extraction")
         return []
 
+def offset_page_url(job_url, start):
+    """Returns the URL of the result page beginning at the given offset."""
+    parsed = urlparse(job_url)
+    query = parse_qs(parsed.query)
+    query['start'] = [str(start)]
+    return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+
+def read_offset_page(browser, url):
+    """
+    Loads a result page by URL and returns all its job IDs.
+
+    Returns:
+        list: Job IDs, empty when the result list has no item (past the last
+        page), or None when the result list did not load at all.
+    """
+    load_page(browser, url, 'search_page')
+    timeout = stage_timeout('job_list')
+    try:
+        WebDriverWait(browser, timeout, poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "ul.scaffold-layout__list-container li"))
+        )
+    except TimeoutException:
+        record_timeout('job_list', timeout)
+        if browser.find_elements(By.CSS_SELECTOR, "ul.scaffold-layout__list-container"):
+            return []
+        logging.warning(f"Job list of {url} did not load")
+        return None
+    # Item attributes are set even for occluded (not rendered) items
+    return read_page_job_ids(browser)
+
+def extract_job_ids_by_offset(browsers, job_url, progress=None):
+    """
+    Collects the job IDs of a search by loading its result pages concurrently.
+
+    The page size is taken from the first page. Pages are then requested in
+    waves of pagination_concurrency; the search ends at the first page that
+    is short or brings no new job. IDs are deduplicated in order. A page that
+    loads neither over HTTP nor in a browser also stops the search; then
+    progress['complete'] (when a dict is given) is False.
+    """
+    if progress is None:
+        progress = {}
+    progress['complete'] = False
+    concurrency = getattr(vars, 'pagination_concurrency', None)
+    session = new_fast_path_session(concurrency or 4)
+    if not concurrency:
+        concurrency = 4 if session is not None else len(browsers)
+    limit = getattr(vars, 'max_search_results', 1000)
+    # Scheduler keys of the concurrent HTTP requests, kept across waves so backoffs carry over
+    slots = [object() for _ in range(concurrency)]
+
+    def read_pages(starts):
+        urls = [offset_page_url(job_url, start) for start in starts]
+        if session is None:
+            pages = [None] * len(urls)
+        else:
+            with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+                pages = list(executor.map(lambda url, slot: fetch_job_ids(session, url, worker=slot), urls, slots))
+        failed = [i for i, page_ids in enumerate(pages) if page_ids is None]
+        if failed and session is not None:
+            profiler.count('http_fallbacks')
+            logging.debug("HTTP page fetch failed, loading the result pages in the browser")
+        if failed:
+            loaded = run_jobs(browsers, [urls[i] for i in failed], read_offset_page)
+            for i, (_, page_ids) in zip(failed, loaded):
+                pages[i] = page_ids
+        return pages
+
+    job_ids = {}
+    # The scheduler is sized for the browsers; the HTTP waves run concurrency requests at once
+    with scheduler.widened(concurrency if session is not None else 1):
+        try:
+            with profiler.stage('pagination'):
+                first = read_pages([0])[0]
+            if first is None:
+                logging.error("First result page did not load, no job found")
+                return []
+            page_size = len(first)
+            job_ids.update(dict.fromkeys(str(job_id) for job_id in first))
+            start = page_size
+            ended = not page_size
+            while not ended and start < limit:
+                starts = [start + i * page_size for i in range(concurrency) if start + i * page_size < limit]
+                with profiler.stage('pagination'):
+                    pages = read_pages(starts)
+                for page_ids in pages:
+                    if page_ids is None:
+                        logging.error(f"Result page did not load, stopping the search at {len(job_ids)} job(s)")
+                        return list(job_ids)
+                    new = [str(job_id) for job_id in page_ids if str(job_id) not in job_ids]
+                    job_ids.update(dict.fromkeys(new))
+                    if not new or len(page_ids) < page_size:
+                        ended = True
+                        break
+                start += len(starts) * page_size
+                logging.info(f"Found {len(job_ids)} job(s)")
+            progress['complete'] = True
+        finally:
+            if session is not None:
+                session.close()
+    return list(job_ids)
+
 def extract_job_ids(browser):
-    """Extracts data-job-id from job list items across all pages."""
+    """Extracts data-job-id from job list items across all pages, up to a page that failed to load."""
     job_ids = []
+    try:
+        job_ids.extend(iter_job_ids(browser))
+    except TimeoutException:
+        pass
+    return job_ids
+
+def iter_job_ids(browser):
+    """
+    Yields data-job-id from job list items as soon as each page is parsed.
+
+    Raises:
+        TimeoutException: A result page did not load, so the search was not read to the end.
+    """
+    found = 0
     while True:
         try:
             WebDriverWait(browser, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "ul.scaffold-layout__list-container"))
             )
-            job_elements = browser.find_elements(By.CSS_SELECTOR, "ul.scaffold-layout__list-container li")
-            for job_element in job_elements:
-                try:
-                    job_id = job_element.get_attribute("data-occludable-job-id")
-                    if job_id:
-                        job_ids.append(job_id)
-                        logging.debug("Processing job ID " + job_id)
-                except StaleElementReferenceException:
-                    logging.info("Stale element reference at " + job_id + ", trying to get the element again.")
-                    job_elements = browser.find_elements(By.CSS_SELECTOR, "ul.scaffold-layout__list-container li")
-                    continue
-            logging.info(f"Found {len(job_ids)} job(s)")
-            if not go_to_next_page(browser):
-                break
         except TimeoutException:
             logging.error("Timed out waiting for job list to load")
+            raise
+        page_ids = read_page_job_ids(browser)
+        found += len(page_ids)
+        logging.info(f"Found {found} job(s)")
+        yield from page_ids
+        if not go_to_next_page(browser):
             break
-    return job_ids
 
+@profiler.timed('dom_read')
+def read_page_job_ids(browser):
+    """Reads the job IDs of the current page, in one script call when possible."""
+    if getattr(vars, 'batched_dom', True):
+        try:
+            page_ids = browser.execute_script(JOB_IDS_SCRIPT)
+            if isinstance(page_ids, list):
+                return [str(job_id) for job_id in page_ids]
+        except WebDriverException as e:
+            logging.debug(f"Batched job ID read failed, reading elements one by one: {e}")
+    page_ids = []
+    job_elements = browser.find_elements(By.CSS_SELECTOR, "ul.scaffold-layout__list-container li")
+    for job_element in job_elements:
+        job_id = None
+        try:
+            job_id = job_element.get_attribute("data-occludable-job-id")
+            if job_id:
+                page_ids.append(job_id)
+                logging.debug("Processing job ID " + job_id)
+        except StaleElementReferenceException:
+            logging.info(f"Stale element reference at {job_id}, trying to get the element again.")
+            job_elements = browser.find_elements(By.CSS_SELECTOR, "ul.scaffold-layout__list-container li")
+            continue
+    return page_ids
+
+@profiler.timed('pagination')
 def go_to_next_page(browser):
-    """Navigates to the next page of job listings, if available."""
+    """
+    Navigates to the next page of job listings, if available.
+
+    Returns:
+        bool: False when there is no clickable Next button (end of the results).
+
+    Raises:
+        TimeoutException: The next page did not load after the click, so the
+        search was not read to the end.
+    """
     try:
         next_button = WebDriverWait(browser, 10).until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, "button.jobs-search-pagination__button--next"))
         )
         # Move to the next button to ensure it is visible
         ActionChains(browser).move_to_element(next_button).perform()
+    except (TimeoutException, NoSuchElementException):
+        logging.info("No more pages or next button not found.")
+        return False
+    # The click loads a page, so it is paced like any other request
+    with scheduler.request(browser) as ticket:
+        start = time.monotonic()
         try:
             next_button.click()
             logging.info("Browsing next page")
         except ElementClickInterceptedException:
             logging.info("Next button click intercepted, scrolling to button and trying again.")
             browser.execute_script("arguments[0].scrollIntoView(true);", next_button)
-            time.sleep(1)
-            next_button.click()
-        wait_for_page_load(browser)
-        return True
-    except (TimeoutException, NoSuchElementException, ElementClickInterceptedException):
-        logging.info("No more pages or next button not found.")
-        return False
+            try:
+                next_button = WebDriverWait(browser, 5, poll_frequency=0.1).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.jobs-search-pagination__button--next"))
+                )
+                next_button.click()
+            except (TimeoutException, NoSuchElementException, ElementClickInterceptedException):
+                logging.info("Next button cannot be clicked, no more pages.")
+                return False
+        wait_for_page_load(browser, 'search_page', start=start)
+        if "checkpoint/challenge" in browser.current_url:
+            ticket.outcome = 'challenge'
+    return True
 
+@profiler.timed('page_load')
 def check_job(browser, jobid):
-    """Check for suitable jobs for relocation"""
+    """Opens a job posting; returns False if the page could not be loaded."""
     try:
-        browser.get("https://www.linkedin.com/jobs/view/" + str(jobid))
-        wait_for_page_load(browser)
-        logging.info("Browsing https://www.linkedin.com/jobs/view/" + str(jobid))
+        url = site_url("/jobs/view/" + str(jobid))
+        # The qualification button is waited for separately, no need for subresources
+        load_page(browser, url, 'job_page', ready_states=('interactive', 'complete'))
+        logging.info("Browsing " + url)
+        return True
     except TimeoutException as e:
         logging.error(f"Timeout while loading the page: {e}")
     except WebDriverException as e:
         logging.error(f"WebDriver exception occurred: {e}")
     except NoSuchWindowException as e:
         logging.error(f"No such window exception: {e}")
+    return False
 
+@profiler.timed('modal_click')
 def click_show_qualification_details(browser):
     """Clicks the 'Show qualification details' button to open the modal."""
     try:
-        show_details_button = WebDriverWait(browser, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[@class='artdeco-button__text' and text()='Show qualification details']"))
-        )
+        start = time.monotonic()
+        timeout = stage_timeout('details_button')
+        try:
+            show_details_button = WebDriverWait(browser, timeout, poll_frequency=0.1).until(
+                EC.element_to_be_clickable((By.XPATH, "//span[@class='artdeco-button__text' and text()='Show qualification details']"))
+            )
+        except TimeoutException:
+            record_timeout('details_button', timeout)
+            raise
+        record_latency('details_button', time.monotonic() - start)
         show_details_button.click()
-        time.sleep(5)
     except (TimeoutException, ElementClickInterceptedException, NoSuchElementException) as e:
+        profiler.count('modal_errors')
         logging.error(f"Error clicking 'Show qualification details' button: {e}. Ignoring entry")
         return False
+    try:
+        # Wait for the skill list to be rendered instead of a fixed delay
+        wait_for_stable_count(browser, SKILL_COUNT_SCRIPT, 'skills_modal')
+    except TimeoutException:
+        profiler.count('timeouts')
+        logging.warning("Skill list did not settle, reading what is available")
     return True
 
 def extract_skills_from_modal(browser):
     """Extracts the text from all divs inside li elements within the modal."""
     skill_texts = []
+    timeout = stage_timeout('skills_modal')
     try:
         # Wait for the modal to be visible
-        WebDriverWait(browser, 10).until(
+        WebDriverWait(browser, timeout, poll_frequency=0.1).until(
             EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'job-details-skill-match-modal__content')]"))
         )
-        # Find all li elements within the specified structure
-        li_elements = browser.find_elements(By.XPATH, "//div[contains(@class, 'job-details-skill-match-modal__content')]//li")
-        logging.info(f"Found {len(li_elements)} skill(s)")
-        for li in li_elements:
-            try:
-                # Extract the text from the div inside each li
-                div_element = li.find_element(By.XPATH, ".//div[2]")
-                logging.debug(f"Scraped skill: {div_element.text}")
-                skill_texts.append(str(div_element.text))
-            except NoSuchElementException:
-                logging.error("No skills found!")
-                continue
+        skill_texts = read_modal_skills(browser)
+        logging.info(f"Found {len(skill_texts)} skill(s)")
     except TimeoutException:
+        record_timeout('skills_modal', timeout)
+        profiler.count('timeouts')
         logging.error("Timed out waiting for skill details to load")
     return skill_texts
 
-def extract_skills_from_jobs(browser, job_ids, job_url):
-    """Extracts skills from job postings."""
+@profiler.timed('dom_read')
+def read_modal_skills(browser):
+    """Reads the skill texts of the open modal, in one script call when possible."""
+    if getattr(vars, 'batched_dom', True):
+        try:
+            texts = browser.execute_script(SKILLS_SCRIPT)
+            if isinstance(texts, list):
+                if None in texts:
+                    logging.error("No skills found!")
+                return [str(text) for text in texts if text is not None]
+        except WebDriverException as e:
+            logging.debug(f"Batched skill read failed, reading elements one by one: {e}")
+    skill_texts = []
+    # Find all li elements within the specified structure
+    li_elements = browser.find_elements(By.XPATH, "//div[contains(@class, 'job-details-skill-match-modal__content')]//li")
+    for li in li_elements:
+        try:
+            # Extract the text from the div inside each li
+            div_element = li.find_element(By.XPATH, ".//div[2]")
+            logging.debug(f"Scraped skill: {div_element.text}")
+            skill_texts.append(str(div_element.text))
+        except NoSuchElementException:
+            logging.error("No skills found!")
+            continue
+    return skill_texts
+
+def scrape_job(browser, jobid):
+    """
+    Loads a job posting and returns its skills.
+
+    A loaded posting without the qualification details button lists no
+    skills and gives []; None (retried on another worker) means the page
+    itself did not load.
+    """
+    if not check_job(browser, jobid):
+        return None
+    if not click_show_qualification_details(browser):
+        return []
+    return extract_skills_from_modal(browser)
+
+def extract_skills_from_jobs(browser, job_ids, job_url, curfile=None):
+    """
+    Extracts skills from job postings.
+
+    Jobs found fresh in the job index are reused instead of visited. When
+    curfile is given (resumed run), jobs already in that journal are skipped.
+    """
     if not job_ids:
         logging.warning("Job buffer empty")
         return []
 
-    curfile = set_filename(job_url)
-    total = len(job_ids)
+    curfile, done = journal_file(job_url, curfile)
+    save_run_state(job_url, curfile, job_ids)
+
+    index = load_job_index()
+    to_visit = [job for job in job_ids if str(job) not in done and not is_fresh(index.get(str(job)))]
+    # No extra Chrome when the index already has (almost) every job
+    extra = max(min(getattr(vars, 'extraction_workers', 1), len(to_visit)) - 1, 0)
+    workers = acquire_workers(extra, vars.cookies_file)
+    scheduler.configure(len(workers) + 1)
+    try:
+        return journal_jobs([browser] + workers, job_ids, job_url, curfile, done, total=len(job_ids), index=index)
+    finally:
+        release_workers(workers)
+
+def extract_jobs_and_skills(browser, job_url, curfile=None):
+    """
+    Paginates the search and extracts skills at the same time.
+
+    The browser walks the result pages and feeds job IDs into the work
+    queue while extraction_workers - 1 extra browsers scrape them; once
+    the last page is read it joins them. When curfile is given (resumed
+    run), the search is paginated again and the jobs already in that
+    journal are skipped.
+    """
+    curfile, done = journal_file(job_url, curfile)
+    save_run_state(job_url, curfile, done, partial=True)
+    workers = acquire_workers(max(getattr(vars, 'extraction_workers', 1) - 1, 0), vars.cookies_file)
+    scheduler.configure(len(workers) + 1)
+    try:
+        if offset_pagination():
+            # Offset pages load concurrently on all browsers, so the IDs are collected first
+            progress = {}
+            job_ids = extract_job_ids_by_offset([browser] + workers, job_url, progress)
+            partial = not progress['complete']
+            save_run_state(job_url, curfile, job_ids, partial=partial)
+            return journal_jobs([browser] + workers, job_ids, job_url, curfile, done, total=len(job_ids),
+                                partial=partial)
+        navigate_to_jobs(browser, job_url)
+        return journal_jobs(workers, iter_job_ids(browser), job_url, curfile, done, paginator=browser)
+    finally:
+        release_workers(workers)
+
+def journal_file(job_url, curfile=None):
+    """Returns the journal of the extraction and the job IDs already in it (curfile given on resume)."""
+    if curfile:
+        done = journal_job_ids(curfile)
+        logging.info(f"Resuming {curfile}: {len(done)} job(s) already extracted")
+        return curfile, done
+    return set_filename(job_url), set()
+
+def new_fast_path_session(pool_size):
+    """Returns the HTTP session of the fast path, or None when it is disabled."""
+    if getattr(vars, 'http_fast_path', False):
+        return new_session(vars.cookies_file, pool_size=pool_size)
+    return None
+
+def job_scraper(index, session=None):
+    """
+    Returns the scrape(browser, job) function of the worker pool: job index, then HTTP, then browser.
+
+    The skill match modal is rendered by the browser after the click, so a
+    plain job page (the default http_job_url) has no skills to parse. After
+    http_fast_path_max_fallbacks fetches in a row fell back to the browser,
+    the fast path is turned off for the rest of the run.
+    """
+    limit = getattr(vars, 'http_fast_path_max_fallbacks', 5)
+    fast_path = {'session': session, 'fallbacks': 0}
+    lock = threading.Lock()
+
+    def fetch(session, browser, job):
+        with profiler.stage('http_fetch'):
+            job_skills = fetch_job_skills(session, job, worker=browser)
+        with lock:
+            if job_skills is not None:
+                fast_path['fallbacks'] = 0
+                return job_skills
+            profiler.count('http_fallbacks')
+            fast_path['fallbacks'] += 1
+            if fast_path['session'] is not None and limit and fast_path['fallbacks'] >= limit:
+                fast_path['session'] = None
+                logging.warning(f"HTTP fast path off for this run after {limit} fallbacks in a row")
+        logging.debug(f"Falling back to the browser for job {job}")
+        return None
+
+    def scrape(browser, job):
+        entry = index.get(str(job))
+        if is_fresh(entry):
+            profiler.count('index_hits')
+            logging.info(f"Job {job} found in index, skipping browser")
+            return entry['skills']
+        with profiler.stage('job'):
+            session = fast_path['session']
+            if session is not None:
+                job_skills = fetch(session, browser, job)
+                if job_skills is not None:
+                    return job_skills
+            return scrape_job(browser, job)
+    return scrape
+
+def journal_jobs(workers, job_ids, job_url, curfile, done, total=None, index=None, paginator=None,
+                 partial=False):
+    """
+    Scrapes the job IDs with the worker browsers and writes them to the journal in order.
+
+    total is None while job_ids is still paginating (paginator being the
+    browser driving it); partial means job_ids is known to miss part of the
+    search. The run state is only cleared once a whole search was read to
+    the end and every job was written.
+    """
+    if index is None:
+        index = load_job_index()
+    batch_size = getattr(vars, 'journal_batch_size', 25)
     skills = []
+    pending = []
+    extracted = []
+    seen = dict.fromkeys(done)
+    source = {'read': False}
+    failed = 0
+    complete = False
+
+    for job in done:
+        # Keep the skill buffer complete for option 3
+        entry = index.get(str(job))
+        skills.append(entry['skills'] if entry else [])
+
+    conn = connect() if sqlite_enabled() else None
+    # One connection per scraping browser, the paginator included once it joins
+    session = new_fast_path_session(len(workers) + (paginator is not None))
+    scrape = job_scraper(index, session)
+
+    def unseen():
+        for job in job_ids:
+            if str(job) not in seen:
+                seen[str(job)] = None
+                yield job
+        source['read'] = True
+
+    # Results come back from the pool in job order
+    scraped = run_jobs(workers, unseen(), scrape, paginator=paginator)
+    try:
+        for i, (job, job_skills) in enumerate(scraped, start=len(done)):
+            if job_skills is None:
+                # Not journaled, so a resumed run visits it again
+                failed += 1
+                logging.error(f"Job {job} failed on every attempt")
+                continue
+            if total:
+                logging.info(f'Processing status: {(i + 1) / total * 100:.2f}% ({i + 1}/{total})')
+            else:
+                logging.info(f'Processing status: {i + 1} job(s)')
+            profiler.job_done()
+            record = new_job_record(job, job_url, job_skills)
+            skills.append(job_skills)
+            pending.append(record)
+            if job_skills and not is_fresh(index.get(str(job))):
+                extracted.append(record)
+            if len(pending) >= batch_size:
+                with profiler.stage('file_save'):
+                    file_save(curfile, pending)
+                    index_jobs(index, extracted)
+                    if conn is not None:
+                        insert_records(conn, pending, curfile)
+                if total is None:
+                    save_run_state(job_url, curfile, list(seen), partial=True)
+                pending = []
+                extracted = []
+        complete = not partial and source['read'] and not failed and len(skills) == len(seen)
+        if not complete:
+            logging.error("Extraction incomplete, choose option 2 again to resume it")
+    finally:
+        # Flush whatever is left, also when the run is interrupted
+        scraped.close()
+        with profiler.stage('file_save'):
+            file_save(curfile, pending)
+            index_jobs(index, extracted)
+            if conn is not None:
+                insert_records(conn, pending, curfile)
+                conn.close()
+        if session is not None:
+            session.close()
+        status = scheduler.status()
+        logging.info(f"Scheduler settled at {status['requests_per_second']} request(s)/s, "
+                     f"concurrency {status['concurrency']}/{status['max_concurrency']}")
+        profiler.export(ext_folder + curfile.replace('.jsonl', '.profile.json'))
+    if complete:
+        clear_run_state()
+    elif total is None or partial:
+        save_run_state(job_url, curfile, list(seen), partial=True)
+    return skills
+
+def batch_filenames(job_urls):
+    """Returns the extraction file of every search, unique even when keywords repeat."""
+    curfiles = {}
+    used = set()
+    for job_url in job_urls:
+        curfile = set_filename(job_url)
+        n = 1
+        while curfile in used:
+            n += 1
+            curfile = set_filename(job_url).replace('.jsonl', f'-{n}.jsonl')
+        used.add(curfile)
+        curfiles[job_url] = curfile
+    return curfiles
+
+def extract_batch(browser, job_urls):
+    """
+    Extracts many searches as one crawl over the union of their postings.
+
+    All searches are paginated first, spread over the browsers, and their
+    job IDs are deduplicated before any posting is visited. Every posting is
+    scraped once and written to the file of each search that returned it.
+
+    Returns:
+        dict: Search URL -> (extraction file, number of jobs written to it).
+    """
+    curfiles = batch_filenames(job_urls)
+    workers = acquire_workers(max(getattr(vars, 'extraction_workers', 1), 1) - 1, vars.cookies_file)
+    browsers = [browser] + workers
+    scheduler.configure(len(browsers))
+    try:
+        # Job ID -> searches returning it, in discovery order
+        searches = {}
+        results = 0
+        with profiler.stage('batch_pagination'):
+            for job_url, job_ids in run_jobs(browsers, list(curfiles), extract_jobs):
+                job_ids = job_ids or []
+                logging.info(f"{len(job_ids)} job(s) found for {job_url}")
+                for job in job_ids:
+                    job_searches = searches.setdefault(str(job), [])
+                    if job_url not in job_searches:
+                        job_searches.append(job_url)
+                        results += 1
+        logging.info(f"{len(searches)} unique job(s) out of {results} search result(s)")
+        return journal_batch(browsers, searches, curfiles)
+    finally:
+        release_workers(workers)
+
+def journal_batch(browsers, searches, curfiles):
+    """Scrapes the union of the job IDs and writes each record to the file of every search that returned it."""
+    index = load_job_index()
+    batch_size = getattr(vars, 'journal_batch_size', 25)
+    pending = {job_url: [] for job_url in curfiles}
+    written = dict.fromkeys(curfiles, 0)
+    extracted = []
+    conn = connect() if sqlite_enabled() else None
+    session = new_fast_path_session(len(browsers))
+
+    def flush():
+        with profiler.stage('file_save'):
+            for job_url, records in pending.items():
+                if records:
+                    file_save(curfiles[job_url], records)
+                    if conn is not None:
+                        insert_records(conn, records, curfiles[job_url])
+                    written[job_url] += len(records)
+                    records.clear()
+            index_jobs(index, extracted)
+            extracted.clear()
 
-    for i, job in enumerate(job_ids):
-        percent = i / total * 100
-        logging.info(f'Processing status: {percent:.2f}% ({i + 1}/{total})')
-        check_job(browser, job)
-        click_show_qualification_details(browser)
-        skills.append(extract_skills_from_modal(browser))
-        file_save(curfile, skills)
-    return skills
\ No newline at end of file
+    scraped = run_jobs(browsers, list(searches), job_scraper(index, session))
+    try:
+        for i, (job, job_skills) in enumerate(scraped, start=1):
+            if job_skills is None:
+                logging.error(f"Job {job} failed on every attempt, not written")
+                continue
+            logging.info(f'Processing status: {i / len(searches) * 100:.2f}% ({i}/{len(searches)})')
+            profiler.job_done()
+            if job_skills and not is_fresh(index.get(str(job))):
+                extracted.append(new_job_record(job, searches[job][0], job_skills))
+            for job_url in searches[job]:
+                pending[job_url].append(new_job_record(job, job_url, job_skills))
+            if i % batch_size == 0:
+                flush()
+    finally:
+        scraped.close()
+        flush()
+        if conn is not None:
+            conn.close()
+        if session is not None:
+            session.close()
+        profiler.export(ext_folder + time.strftime('%d-%m-%y_%H:%M:%S') + '-batch.profile.json')
+    return {job_url: (curfiles[job_url], written[job_url]) for job_url in curfiles}
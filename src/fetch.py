@@ -0,0 +1,235 @@
+import json
+import logging
+import requests
+
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
+
+import vars
+from scheduler import scheduler
+
+JOB_URL = "{site}/jobs/view/{job_id}"
+LINKEDIN_URL = "https://www.linkedin.com"
+# Rate limited, or LinkedIn's non-standard "request denied"
+CHALLENGE_STATUS = (429, 999)
+MODAL_CLASS = "job-details-skill-match-modal__content"
+JOB_LIST_CLASS = "scaffold-layout__list-container"
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+SKILL_KEYS = {'skill', 'skillName', 'skills'}
+
+class SkillModalParser(HTMLParser):
+    """Collects the text of the second div of each li inside the skill match modal."""
+
+    def __init__(self):
+        super().__init__()
+        self.skills = []
+        # One frame per open element: [tag, div children seen, role]
+        self.stack = []
+        self.buffer = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        parent = self.stack[-1] if self.stack else None
+        if tag == 'div' and parent is not None:
+            parent[1] += 1
+        if self.buffer is not None:
+            # Nested blocks render on their own line, as in WebElement.text
+            self.buffer.append(' ')
+        role = None
+        if tag == 'div' and MODAL_CLASS in (dict(attrs).get('class') or ''):
+            role = 'modal'
+        elif tag == 'li' and self._inside('modal'):
+            role = 'li'
+        elif tag == 'div' and parent is not None and parent[1] == 2 and self.buffer is None and self._inside('li'):
+            role = 'skill'
+            self.buffer = []
+            # Only the first match of each li is a skill, like find_element
+            for frame in reversed(self.stack):
+                if frame[2] == 'li':
+                    frame[2] = 'li-done'
+                    break
+        self.stack.append([tag, 0, role])
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        # Pop up to the matching tag, tolerating unclosed children
+        for pos in range(len(self.stack) - 1, -1, -1):
+            if self.stack[pos][0] == tag:
+                for frame in self.stack[pos:]:
+                    if frame[2] == 'skill':
+                        text = ' '.join(''.join(self.buffer).split())
+                        if text:
+                            self.skills.append(text)
+                        self.buffer = None
+                del self.stack[pos:]
+                return
+
+    def handle_data(self, data):
+        if self.buffer is not None:
+            self.buffer.append(data)
+
+    def _inside(self, role):
+        return any(frame[2] == role for frame in self.stack)
+
+class JobListParser(HTMLParser):
+    """Collects the job IDs of the items of a search result list, rendered or not."""
+
+    def __init__(self):
+        super().__init__()
+        self.job_ids = []
+        self.has_list = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'ul' and JOB_LIST_CLASS in (attrs.get('class') or '').split():
+            self.has_list = True
+        job_id = attrs.get('data-occludable-job-id')
+        if tag == 'li' and job_id:
+            self.job_ids.append(job_id)
+
+def parse_job_ids_html(html):
+    """
+    Extracts the job IDs of a search result page.
+
+    Returns:
+        list: Job IDs of the list (empty past the last page), or None when
+        the page has no result list, e.g. a guest or client rendered page.
+    """
+    parser = JobListParser()
+    parser.feed(html)
+    parser.close()
+    return parser.job_ids if parser.has_list else None
+
+def parse_skills_html(html):
+    """Extracts the skill list from a job page that contains the skill match modal."""
+    if MODAL_CLASS not in html:
+        return []
+    parser = SkillModalParser()
+    parser.feed(html)
+    parser.close()
+    return parser.skills
+
+def parse_skills_json(data):
+    """Extracts skill names from a JSON payload, looking for skill-like keys at any depth."""
+    skills = []
+
+    def collect(value):
+        if isinstance(value, str):
+            skills.append(value.strip())
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, dict):
+            for key in ('name', 'skillName', 'skill'):
+                if isinstance(value.get(key), str):
+                    skills.append(value[key].strip())
+                    return
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in SKILL_KEYS:
+                    collect(item)
+                else:
+                    walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return [skill for skill in skills if skill]
+
+def new_session(cookies_file, pool_size=None):
+    """Creates a keep-alive HTTP session authenticated with the cookies saved by Selenium."""
+    if pool_size is None:
+        pool_size = getattr(vars, 'extraction_workers', 1)
+    # A pool of 0 keeps no connection alive, so every request would open a new one
+    pool_size = max(pool_size, 1)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': getattr(vars, 'http_user_agent', 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                              '(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36'),
+        'Accept': 'text/html,application/json;q=0.9,*/*;q=0.8',
+    })
+    try:
+        with open(cookies_file, 'r') as file:
+            for cookie in json.load(file):
+                session.cookies.set(cookie['name'], cookie['value'],
+                                    domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+                if cookie['name'] == 'JSESSIONID':
+                    # LinkedIn expects the session id as CSRF token on API calls
+                    session.headers['csrf-token'] = cookie['value'].strip('"')
+    except (OSError, ValueError, KeyError) as e:
+        logging.error(f"Unable to load cookies for HTTP session: {e}")
+        return None
+    return session
+
+def scheduled_get(session, url, timeout=10, worker=None):
+    """
+    GETs url through the request scheduler; returns the response if it is a 200, else None.
+
+    The session is shared, so worker identifies who backs off after a
+    failure: a long-lived object of the caller (its browser, or a page
+    slot), not the thread, which may only live for one wave of requests.
+    Without one, all requests of the session back off together.
+    """
+    with scheduler.request(session if worker is None else worker) as ticket:
+        try:
+            response = session.get(url, timeout=timeout, allow_redirects=False)
+        except requests.RequestException as e:
+            ticket.outcome = 'timeout' if isinstance(e, requests.Timeout) else 'error'
+            logging.debug(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code in CHALLENGE_STATUS or 'checkpoint' in response.headers.get('Location', ''):
+            ticket.outcome = 'challenge'
+        elif response.status_code >= 500:
+            ticket.outcome = 'error'
+    if response.status_code != 200:
+        logging.debug(f"HTTP fetch for {url} returned {response.status_code}")
+        return None
+    return response
+
+def fetch_job_skills(session, jobid, timeout=10, worker=None):
+    """
+    Fetches a job page over HTTP and parses its skills (worker as in scheduled_get).
+
+    Returns:
+        list: Skills found, or None when the lightweight fetch failed and the
+        browser should be used instead.
+    """
+    site = getattr(vars, 'linkedin_url', LINKEDIN_URL).rstrip('/')
+    url = getattr(vars, 'http_job_url', JOB_URL).format(site=site, job_id=jobid)
+    response = scheduled_get(session, url, timeout, worker)
+    if response is None:
+        return None
+    if 'json' in response.headers.get('Content-Type', ''):
+        try:
+            skills = parse_skills_json(response.json())
+        except ValueError:
+            return None
+    else:
+        skills = parse_skills_html(response.text)
+    if not skills:
+        return None
+    logging.info(f"Fetched {len(skills)} skill(s) for job {jobid} over HTTP")
+    return skills
+
+def fetch_job_ids(session, url, timeout=10, worker=None):
+    """
+    Fetches a search result page over HTTP and parses its job IDs (worker as in scheduled_get).
+
+    Returns:
+        list: Job IDs of the page (empty past the last page), or None when
+        the fetch failed or returned no result list, and the browser should
+        be used instead.
+    """
+    response = scheduled_get(session, url, timeout, worker)
+    if response is None:
+        return None
+    return parse_job_ids_html(response.text)
@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import logging
+import re
+
+from urllib.parse import parse_qs, urlparse
+
+from vars import exp_folder, ext_folder
+
+def set_filename(url):
+    t = time.localtime()
+    current_time = time.strftime('%d-%m-%y_%H:%M:%S', t)
+    filename = current_time
+    filename = filename + "-" + search_keyword(url)
+    filename = filename.replace(' ', '-')
+    filename = filename + '.jsonl'
+    return filename
+
+def search_keyword(url):
+    """Returns the keywords of a search URL, or 'recommended' when there are none."""
+    query_params = parse_qs(urlparse(url).query)
+    if 'keywords' in query_params:
+        return query_params['keywords'][0]
+    return "recommended"
+
+def set_job_url(default_url):
+    domain = "linkedin.com"
+    required_params = ["geoId", "keywords"]
+    
+    job_url = input("\nSet URL (Enter for default): ")
+    if job_url:
+        parsed_url = urlparse(job_url)
+        if re.search(domain, parsed_url.netloc):
+            query_params = parse_qs(parsed_url.query)
+            if all(param in query_params for param in required_params):
+                logging.info("URL updated")
+                return job_url
+        logging.warning("Invalid URL. Fallback to default")
+        return default_url
+    else:
+        logging.info("Fallback to default")
+        return default_url
+
+def read_search_urls(file_path):
+    """Reads the search URLs of a batch file: one per line, blank lines and # comments ignored, duplicates dropped."""
+    urls = {}
+    with open(file_path, 'r') as file:
+        for line in file:
+            url = line.strip()
+            if not url or url.startswith('#'):
+                continue
+            if urlparse(url).scheme not in ('http', 'https'):
+                logging.warning("Skipping invalid search URL: " + url)
+                continue
+            urls[url] = None
+    return list(urls)
+
+def filename_timestamp(file_path):
+    """Parses the extraction time set_filename puts at the start of the file name."""
+    try:
+        parsed = time.strptime(os.path.basename(file_path)[:17], '%d-%m-%y_%H:%M:%S')
+    except ValueError:
+        return None
+    return time.strftime('%Y-%m-%dT%H:%M:%S', parsed)
+
+def new_job_record(job_id, url, skills):
+    """Builds a journal record for a single extracted job."""
+    return {
+        'job_id': str(job_id),
+        'search_url': url,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+        'skills': list(skills),
+    }
+
+def file_save(filename, records):
+    """Appends job records to the extraction journal (one JSON object per line)."""
+    if not records:
+        return
+    with open(ext_folder + filename, 'a') as file:
+        file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+
+def set_excelname(url):
+    filename = time.strftime('%d-%m-%y_%H:%M:%S', time.localtime())
+    parsed_url = urlparse(url)
+    query_params = parse_qs(parsed_url.query)
+    if 'keywords' in query_params:
+        filename = filename + "_" + query_params['keywords'][0]
+    else:
+        filename = filename + "_" + url
+        filename = filename.replace(ext_folder, '')
+        filename = filename.replace('.jsonl','')
+        filename = filename.replace('.txt','')
+    filename = filename.replace(' ', '-')
+    filename = exp_folder + filename + '.xlsx'
+    return filename
+
+def state_path(name):
+    """Returns the path of an internal state file kept under the extraction folder."""
+    folder = os.path.join(ext_folder, '.state')
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+def list_files_in_directory(directory, extensions=('.jsonl', '.txt')):
+    """Lists extraction files in the given directory and returns a list of file paths."""
+    files = os.listdir(directory)
+    files = [os.path.join(directory, f) for f in files
+             if os.path.isfile(os.path.join(directory, f)) and f.endswith(extensions) and not f.startswith('.')]
+    return files
\ No newline at end of file
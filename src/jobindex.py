@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import logging
+
+import vars
+from files import state_path
+
+INDEX_FILE = 'job-index.jsonl'
+RUN_FILE = 'run.json'
+
+def load_job_index():
+    """Loads the index of already extracted jobs, keyed by job ID."""
+    index = {}
+    path = state_path(INDEX_FILE)
+    if not os.path.exists(path):
+        return index
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logging.warning("Skipping corrupted job index entry")
+                continue
+            # Later entries win, so re-extracted jobs refresh their timestamp
+            index[entry['job_id']] = entry
+    logging.info(f"Job index loaded with {len(index)} job(s)")
+    return index
+
+def index_jobs(index, records):
+    """Appends extracted job records to the persistent job index."""
+    if not records:
+        return
+    with open(state_path(INDEX_FILE), 'a') as file:
+        for record in records:
+            entry = {'job_id': record['job_id'], 'extracted_at': time.time(), 'skills': record['skills']}
+            index[entry['job_id']] = entry
+            file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def is_fresh(entry, ttl_days=None):
+    """Checks whether an index entry is recent enough to be reused."""
+    if ttl_days is None:
+        ttl_days = getattr(vars, 'job_index_ttl_days', 30)
+    if not entry or not entry.get('skills') or ttl_days <= 0:
+        return False
+    return time.time() - entry['extracted_at'] < ttl_days * 86400
+
+def save_run_state(job_url, filename, job_ids, partial=False):
+    """
+    Records the running extraction so it can be resumed if interrupted.
+
+    partial means job_ids is not the whole search yet (pagination still
+    running or failed), so a resumed run paginates again.
+    """
+    with open(state_path(RUN_FILE), 'w') as file:
+        json.dump({'search_url': job_url, 'file': filename, 'job_ids': [str(j) for j in job_ids],
+                   'partial': partial}, file)
+
+def clear_run_state():
+    """Marks the running extraction as complete."""
+    path = state_path(RUN_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+def load_interrupted_run(job_url):
+    """Returns the state of an interrupted extraction for the given search, if any."""
+    path = state_path(RUN_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as file:
+        run = json.load(file)
+    if run.get('search_url') != job_url:
+        return None
+    return run
+
+def journal_job_ids(filename):
+    """Returns the job IDs already written to an extraction journal."""
+    done = set()
+    path = os.path.join(vars.ext_folder, filename)
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                done.add(json.loads(line)['job_id'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
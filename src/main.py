@@ -1,13 +1,16 @@
+import os
+import sys
 import logging
+import argparse
 
-from selenium.common.exceptions import TimeoutException
+from datetime import datetime
 
-from utils import initiate_browser, quit_browser, set_job_url, handle_login, save_to_excel
-from process import process_all_skills
-from extraction import extract_jobs, extract_skills_from_jobs
-from process import process_skills_from_file, process_all_files
 from vars import default_job_url, cookies_file
 
+# The browser (selenium), processing (pandas), analytics (numpy) and export
+# (openpyxl) subsystems are imported inside the options that use them, so
+# the menu and the analysis-only paths start without the browser stack.
+
 def display_menu():
     """Displays the menu options."""
     print("\nMenu:")
@@ -16,7 +19,23 @@ def display_menu():
     print("3. Process extracted skills")
     print("4. Process skills from single file")
     print("5. Process skills from all files")
-    print("6. Exit")
+    print("6. Analyze skill co-occurrence from all files")
+    print("7. Query skills database")
+    print("8. Track skill trends across extractions")
+    print("9. Exit")
+
+def offer_export(df, url, numjobs, extra_sheets=None):
+    """Asks whether and in which format to export the processed skills."""
+    xlsexport = input("\nExport results (y/n): ")
+    if xlsexport == 'y':
+        fmt = input("Format (xlsx/csv/parquet, Enter for xlsx): ") or 'xlsx'
+        from export import export
+        try:
+            export(df, url, numjobs, fmt, extra_sheets)
+        except:
+            logging.error("Cannot export to " + fmt + ".")
+    else:
+        logging.info("Skipping export.")
 
 def menu():
     """Displays a menu and executes the chosen option."""
@@ -30,82 +49,262 @@ def menu():
 
         print("\nCurrent job search: " + job_url)
 
-        choice = input("\nYour option: (1-6): ")
+        choice = input("\nYour option: (1-9): ")
 
         if choice == '1':
+            from files import set_job_url
             job_url = set_job_url(default_job_url)
         elif choice == '2':
-            browser = initiate_browser()
+            from browser import get_browser, release_browser, discard_browser
+            from extraction import extract_skills_from_jobs, extract_jobs_and_skills
+            from jobindex import load_interrupted_run
+            from metrics import profiler
+            profiler.reset()
+            browser = None
             try:
-                handle_login(browser, cookies_file)
-                job_ids = extract_jobs(browser, job_url)
-                if browser:
-                    skills = extract_skills_from_jobs(browser, job_ids, job_url)
+                with profiler.stage('login'):
+                    # A warm browser from a previous run is already logged in
+                    browser = get_browser(cookies_file)
+                run = load_interrupted_run(job_url)
+                if (run and (run['job_ids'] or run.get('partial'))
+                        and input("\nResume interrupted extraction " + run['file'] + " (y/n): ") == 'y'):
+                    if run.get('partial'):
+                        # Interrupted while paginating: walk the pages again, skipping the extracted jobs
+                        skills = extract_jobs_and_skills(browser, job_url, run['file'])
+                    else:
+                        # Reuse the job IDs of the interrupted run, no pagination needed
+                        job_ids = run['job_ids']
+                        skills = extract_skills_from_jobs(browser, job_ids, job_url, run['file'])
+                elif browser:
+                    # Pagination and skill extraction run concurrently
+                    skills = extract_jobs_and_skills(browser, job_url)
                 else:
                     logging.warning("Browser is not initiated.")
+                print("\nRun profile:\n" + profiler.summary())
+                release_browser(browser)
             except:
                 if browser:
-                    quit_browser(browser)
+                    discard_browser(browser)
                     logging.error("Unable to process.")
         elif choice == '3':
             if skills:
+                from process import process_all_skills
                 skillsbuffer = process_all_skills(skills)
                 print("\nTotal processed jobs: " + str(skillsbuffer[1]) + "\n")
                 print(skillsbuffer[0])
-                xlsexport = input("\nExport to XLS (y/n): ")
-                if xlsexport == 'y':
-                    try:
-                        save_to_excel(skillsbuffer[0], job_url, skillsbuffer[1])
-                    except:
-                        logging.error("Cannot export to XLS.")
-                else:
-                    logging.info("Skipping export.")
+                offer_export(skillsbuffer[0], job_url, skillsbuffer[1])
             else:
                 logging.warning("Skill buffer is empty.")
         elif choice == '4':
+            from process import process_skills_from_file
             skillsbuffer = process_skills_from_file()
             if skillsbuffer is not None:
                 print("\nTotal processed jobs: " + str(skillsbuffer[0][1]) + "\n")
                 print(skillsbuffer[0][0])
-                xlsexport = input("\nExport to XLS (y/n): ")
-                if xlsexport == 'y':
-                    try:
-                        save_to_excel(skillsbuffer[0][0], skillsbuffer[1], skillsbuffer[0][1])
-                    except:
-                        logging.error("Cannot export to XLS.")
-                else:
-                    logging.info("Skipping export.")
+                offer_export(skillsbuffer[0][0], skillsbuffer[1], skillsbuffer[0][1])
             else:
                 logging.warning("No valid file processed.")
         elif choice == '5':
+            from process import process_all_files
             skillsbuffer = process_all_files()
             if skillsbuffer is not None:
                 print("\nTotal processed jobs: " + str(skillsbuffer[1]) + "\n")
                 print(skillsbuffer[0])
-                xlsexport = input("\nExport to XLS (y/n): ")
-                if xlsexport == 'y':
+                offer_export(skillsbuffer[0], 'all-files', skillsbuffer[1])
+            else:
+                logging.warning("No valid file processed.")                
+        elif choice == '6':
+            search = input("\nSearch filter, e.g. a keyword (Enter for all): ") or None
+            since = input("Extracted since YYYY-MM-DD (Enter for all): ")
+            try:
+                since = parse_date(since) if since else None
+            except ValueError:
+                logging.warning("Invalid date, using all.")
+                since = None
+            from analytics import load_corpus_matrix, skill_pairs, best_skill_set
+            matrix = load_corpus_matrix()
+            mask = matrix.mask(search, since) if search or since else None
+            if matrix.n_jobs and (mask is None or mask.any()):
+                skillsbuffer = matrix.top_k(mask=mask)
+                pairs = skill_pairs(matrix, mask=mask)
+                bundle = best_skill_set(matrix, 100, mask=mask)
+                print("\nTotal processed jobs: " + str(skillsbuffer[1]) + "\n")
+                print("Skills appearing together:\n")
+                print(pairs.head(50))
+                print("\nBest skills to cover the most jobs:\n")
+                print(bundle)
+                offer_export(skillsbuffer[0], 'all-files-cooccurrence', skillsbuffer[1],
+                             {'Co-occurrence': pairs, 'Best skills': bundle})
+            else:
+                logging.warning("No valid file processed.")
+        elif choice == '7':
+            import_new = input("\nImport new files from the extraction folder (y/n): ") == 'y'
+            keyword = input("Keyword (Enter for all searches): ") or None
+            days = input("Last N days (Enter for all): ")
+            try:
+                since_days = int(days) if days else None
+            except ValueError:
+                logging.warning("Invalid number of days, using all.")
+                since_days = None
+            from process import process_database
+            skillsbuffer = process_database(keyword, since_days, import_new)
+            if skillsbuffer is not None:
+                print("\nTotal processed jobs: " + str(skillsbuffer[1]) + "\n")
+                print(skillsbuffer[0])
+                offer_export(skillsbuffer[0], 'database-' + (keyword or 'all'), skillsbuffer[1])
+            else:
+                logging.warning("No jobs found in the database.")
+        elif choice == '8':
+            from trends import update_trends, trend_table, movers
+            from export import set_exportname
+            state = update_trends()
+            if state['series']:
+                rising, falling = movers(state)
+                print("\nRising skills (percentage points since the previous snapshot):\n")
+                print(rising)
+                print("\nFalling skills:\n")
+                print(falling)
+                csvexport = input("\nExport time series to CSV (y/n): ")
+                if csvexport == 'y':
                     try:
-                        save_to_excel(skillsbuffer[0], 'all-files', skillsbuffer[1])
+                        trend_table(state).to_csv(set_exportname('trends', 'csv'), index=False)
                     except:
-                        logging.error("Cannot export to XLS.")
+                        logging.error("Cannot export to CSV.")
                 else:
                     logging.info("Skipping export.")
             else:
-                logging.warning("No valid file processed.")                
-        elif choice == '6':
-            if browser:
-                quit_browser(browser)
-                logging.debug("Browser closed successfully...")
+                logging.warning("No valid file processed.")
+        elif choice == '9':
+            if 'browser' in sys.modules:
+                # Only close browsers when the browser subsystem was used
+                from browser import close_all
+                close_all()
+            logging.debug("Browser closed successfully...")
             break
         else:
             logging.warning("Invalid entry")
 
-def main():
+def parse_date(value):
+    """Parses a YYYY-MM-DD date (or ISO date and time) given on the command line or the menu."""
+    return datetime.fromisoformat(value)
+
+def analyze(files, fmt='xlsx', name=None, search=None, since=None):
+    """
+    Processes saved extraction files without the menu or the browser.
+
+    Args:
+        files (list): Extraction files; all files of the extraction folder when empty.
+        fmt (str): Export format (xlsx, csv or parquet), or None to only print the results.
+        name (str): Name used for the export file.
+        search (str): Only jobs whose search URL contains this text (e.g. a keyword).
+        since (datetime): Only jobs extracted at or after this time.
+
+    Returns:
+        tuple: (DataFrame, number of processed jobs), or None when no file was processed.
+    """
+    if fmt == 'parquet':
+        from export import parquet_available
+        if not parquet_available():
+            logging.error("Parquet export needs pyarrow: pip install pyarrow")
+            return None
+
+    from process import process_all_files, count_files, build_skills_frame, fold_skill_counts
+
+    if files:
+        missing = [file for file in files if not os.path.isfile(file)]
+        if missing:
+            logging.error("File(s) not found: " + ", ".join(missing))
+            return None
+    if search or since:
+        # Filters are masks over the job x skill matrix, which keeps the search and date of every job
+        from analytics import load_corpus_matrix
+        matrix = load_corpus_matrix(files or None)
+        skillsbuffer = matrix.top_k(mask=matrix.mask(search, since))
+    elif files:
+        id_counts, jobtotal = count_files(files)
+        skillsbuffer = build_skills_frame(fold_skill_counts(id_counts), jobtotal)
+    else:
+        skillsbuffer = process_all_files()
+    if skillsbuffer is None or not skillsbuffer[1]:
+        logging.warning("No valid file processed.")
+        return None
+    print("\nTotal processed jobs: " + str(skillsbuffer[1]) + "\n")
+    print(skillsbuffer[0])
+    if fmt:
+        from export import export
+        export(skillsbuffer[0], name or 'all-files', skillsbuffer[1], fmt)
+    return skillsbuffer
+
+def batch(file_path):
+    """
+    Extracts every search URL of a batch file in one crawl, logging in once.
+
+    Returns:
+        dict: Search URL -> (extraction file, number of jobs), or None when nothing ran.
+    """
+    from files import read_search_urls
+    try:
+        job_urls = read_search_urls(file_path)
+    except OSError as e:
+        logging.error(f"Cannot read {file_path}: {e}")
+        return None
+    if not job_urls:
+        logging.error("No search URL found in " + file_path)
+        return None
+
+    from browser import get_browser, release_browser, close_all
+    from extraction import extract_batch
+    from metrics import profiler
+    profiler.reset()
+    with profiler.stage('login'):
+        browser = get_browser(cookies_file)
+    if browser is None:
+        logging.error("Browser is not initiated.")
+        return None
+    try:
+        results = extract_batch(browser, job_urls)
+    finally:
+        release_browser(browser)
+        close_all()
+    print("\nRun profile:\n" + profiler.summary())
+    print("\nExtraction files:")
+    for job_url, (curfile, jobs) in results.items():
+        print(f"{jobs:>6} job(s)  {curfile}  {job_url}")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SkilledIn - LinkedIn skills scraper. Without a command, the interactive menu starts.")
+    commands = parser.add_subparsers(dest='command')
+    parser_analyze = commands.add_parser('analyze', help="process saved extraction files without the browser")
+    parser_analyze.add_argument('files', nargs='*', help="extraction files (default: all files of the extraction folder)")
+    parser_analyze.add_argument('--format', choices=('xlsx', 'csv', 'parquet'), default='xlsx', help="export format (default: xlsx)")
+    parser_analyze.add_argument('--name', help="name of the export file (default: all-files)")
+    parser_analyze.add_argument('--no-export', action='store_true', help="only print the results")
+    parser_analyze.add_argument('--search', help="only jobs whose search URL contains this text, e.g. a keyword")
+    parser_analyze.add_argument('--since', type=parse_date, metavar='YYYY-MM-DD', help="only jobs extracted since this date")
+    parser_batch = commands.add_parser('batch', help="extract all search URLs of a file in one crawl")
+    parser_batch.add_argument('file', help="text file with one search URL per line (# starts a comment)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to control the flow of the script."""
+    args = parse_args(argv)
+    if args.command == 'analyze':
+        result = analyze(args.files, None if args.no_export else args.format, args.name, args.search, args.since)
+        return 0 if result is not None else 1
+    if args.command == 'batch':
+        return 0 if batch(args.file) is not None else 1
     try:
         menu()
-    except TimeoutException:
+    except Exception as e:
+        # Selenium is only loaded once a browser option was used
+        if 'selenium' not in sys.modules:
+            raise
+        from selenium.common.exceptions import TimeoutException
+        if not isinstance(e, TimeoutException):
+            raise
         logging.error("Error during processing")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
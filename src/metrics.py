@@ -0,0 +1,98 @@
+import json
+import time
+import functools
+import logging
+import threading
+
+from contextlib import contextmanager
+
+class Profiler:
+    """Collects per-stage latencies and event counters of an extraction run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.samples = {}
+            self.counters = {}
+            self.jobs = 0
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block as one sample of the given stage."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as a sample of the given stage."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def job_done(self):
+        with self.lock:
+            self.jobs += 1
+
+    def report(self):
+        """Returns the run profile as a dict: stage percentiles, counters and throughput."""
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            stages = {}
+            for name, samples in self.samples.items():
+                ordered = sorted(samples)
+                stages[name] = {
+                    'count': len(ordered),
+                    'total': round(sum(ordered), 3),
+                    'p50': round(_percentile(ordered, 0.50), 3),
+                    'p95': round(_percentile(ordered, 0.95), 3),
+                    'max': round(ordered[-1], 3),
+                }
+            return {
+                'elapsed': round(elapsed, 3),
+                'jobs': self.jobs,
+                'jobs_per_minute': round(self.jobs / elapsed * 60, 2) if elapsed > 0 else 0.0,
+                'stages': stages,
+                'counters': dict(self.counters),
+            }
+
+    def summary(self):
+        """Formats the run profile as a printable table."""
+        report = self.report()
+        lines = [f"Jobs: {report['jobs']} in {report['elapsed']:.1f}s ({report['jobs_per_minute']} jobs/min)",
+                 f"{'Stage':<16}{'Count':>8}{'p50':>10}{'p95':>10}{'Max':>10}{'Total':>10}"]
+        for name, stage in sorted(report['stages'].items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{name:<16}{stage['count']:>8}{stage['p50']:>10.3f}{stage['p95']:>10.3f}"
+                         f"{stage['max']:>10.3f}{stage['total']:>10.1f}")
+        for name, value in sorted(report['counters'].items()):
+            lines.append(f"{name}: {value}")
+        return '\n'.join(lines)
+
+    def export(self, path):
+        """Writes the run profile as JSON."""
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        logging.info("Run profile saved at " + path)
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+# Shared by all modules of a run
+profiler = Profiler()
@@ -9,12 +9,44 @@ from selenium.common.exceptions import (
     TimeoutException, NoSuchElementException, WebDriverException, NoSuchWindowException
 )
 
+from waits import stage_timeout, record_latency, record_timeout, wait_for_url_exit
+from metrics import profiler
+from scheduler import scheduler
+
+LINKEDIN_URL = "https://www.linkedin.com"
+
+def site_url(path=''):
+    """Returns a LinkedIn URL, on the site set by linkedin_url (e.g. a local fixture server)."""
+    return getattr(vars, 'linkedin_url', LINKEDIN_URL).rstrip('/') + path
+
+def load_page(browser, url, stage, ready_states=('complete',)):
+    """
+    Opens url through the request scheduler and waits for it to load (see wait_for_page_load).
+
+    The browser uses the eager page load strategy, so get() returns once the
+    document is interactive. The learned timeout of the stage bounds get()
+    itself and the wait that follows, both timed from the request.
+    """
+    timeout = stage_timeout(stage)
+    with scheduler.request(browser) as ticket:
+        start = time.monotonic()
+        browser.set_page_load_timeout(timeout)
+        try:
+            browser.get(url)
+        except TimeoutException:
+            profiler.count('timeouts')
+            record_timeout(stage, timeout)
+            logging.error("Page load timed out")
+            raise
+        wait_for_page_load(browser, stage, timeout, ready_states, start)
+        if "checkpoint/challenge" in browser.current_url:
+            ticket.outcome = 'challenge'
+
 def navigate_to_login(browser):
     """Navigates to the LinkedIn login page."""
     try: 
-        browser.get("https://www.linkedin.com/login")
         logging.info("Navigating to login")
-        wait_for_page_load(browser)
+        load_page(browser, site_url("/login"), 'login_page')
     except TimeoutException as e:
         logging.error(f"Timeout while loading the page: {e}")
     except WebDriverException as e:
@@ -22,14 +54,32 @@ def navigate_to_login(browser):
     except NoSuchWindowException as e:
         logging.error(f"No such window exception: {e}")
 
-def wait_for_page_load(browser, timeout=10):
-    """Waits for the page to fully load."""
+def wait_for_page_load(browser, stage, timeout=None, ready_states=('complete',), start=None):
+    """
+    Waits for the page to load (readyState in ready_states), with an adaptive timeout.
+
+    Each kind of page (login_page, search_page, job_page) is its own stage,
+    so fast job pages do not shorten the timeout of heavier pages. start is
+    when the navigation began (default: now); the latency and the timeout
+    are counted from it.
+
+    A timeout is raised to the caller and the browser is kept, so the
+    scheduler can back off and the job can be retried.
+    """
+    if timeout is None:
+        timeout = stage_timeout(stage)
+    if start is None:
+        start = time.monotonic()
     try:
-        WebDriverWait(browser, timeout).until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
+        WebDriverWait(browser, max(timeout - (time.monotonic() - start), 0.1), poll_frequency=0.1).until(
+            lambda driver: driver.execute_script('return document.readyState') in ready_states
+        )
+        record_latency(stage, time.monotonic() - start)
         logging.info("Load waiting")
     except TimeoutException:
+        profiler.count('timeouts')
+        record_timeout(stage, timeout)
         logging.error("Page load timed out")
-        browser.quit()
         raise
 
 def perform_login(browser):
@@ -58,18 +108,22 @@ def perform_login(browser):
         raise
 
 def handle_checkpoint(browser):
-    """Handles the checkpoint challenge (20sec for human interaction)."""
-    while "checkpoint/challenge" in browser.current_url:
-        logging.info("Challenge found. Waiting 20 secs")
-        time.sleep(20)
-        logging.info("Challenge waiting time exceeded")
+    """
+    Handles the checkpoint challenge, waiting for human interaction until the URL changes.
+
+    Raises:
+        TimeoutException: The challenge was not solved within challenge_timeout seconds.
+    """
+    if "checkpoint/challenge" in browser.current_url:
+        logging.info("Challenge found. Waiting for it to be solved")
+        wait_for_url_exit(browser, "checkpoint/challenge", timeout=getattr(vars, 'challenge_timeout', 600))
+        logging.info("Challenge solved")
 
 def navigate_to_jobs(browser, url):
     """Navigates to the specific jobs page."""
     try:
-        browser.get(str(url))
         logging.info("Navigating to jobs URL")
-        wait_for_page_load(browser)
+        load_page(browser, str(url), 'search_page')
     except TimeoutException as e:
         logging.error(f"Timeout while loading the page: {e}")
     except WebDriverException as e:
@@ -0,0 +1,223 @@
+import time
+import queue
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import vars
+
+from utils import initiate_browser, handle_login, quit_browser
+from metrics import profiler
+
+# Seconds the pool waits for the workers to finish their current job when it stops
+JOIN_TIMEOUT = 30
+
+def open_worker_browsers(count, cookies_file):
+    """Starts extra Chrome instances in parallel, all logged in with the saved cookies."""
+    def start(_):
+        browser = initiate_browser()
+        if browser is None:
+            return None
+        try:
+            handle_login(browser, cookies_file)
+            return browser
+        except Exception as e:
+            logging.error(f"Unable to log in worker browser: {e}")
+            quit_browser(browser)
+            return None
+
+    if count <= 0:
+        return []
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        browsers = list(executor.map(start, range(count)))
+    browsers = [b for b in browsers if b is not None]
+    logging.info(f"{len(browsers)} worker browser(s) ready")
+    return browsers
+
+def _next_item(work, retry, stop):
+    """Returns the next job to scrape, retries first, or None once stopped."""
+    while not stop.is_set():
+        try:
+            return retry.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return work.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+def _worker(wid, browser, scrape, work, state):
+    """Consumes jobs from the work queue until the pool is stopped."""
+    failures = 0
+    try:
+        while True:
+            item = _next_item(work, state['retry'], state['stop'])
+            if item is None:
+                break
+            seq, job_id, failed_on, attempts = item
+            with state['lock']:
+                consumers = state['consumers']
+            if wid in failed_on and len(failed_on) < consumers:
+                # Leave the retry to a worker that has not failed this job yet
+                state['retry'].put(item)
+                time.sleep(0.1)
+                continue
+            try:
+                skills = scrape(browser, job_id)
+                failures = 0
+            except Exception as e:
+                # Also a dead chromedriver (urllib3 errors) or a bug in scrape
+                logging.error(f"Worker {wid} failed on job {job_id}: {e!r}")
+                skills = None
+                failures += 1
+            # Counted apart from failed_on, which stops growing when one worker is left
+            if skills is None and attempts < state['retries']:
+                profiler.count('retries')
+                logging.info(f"Retrying job {job_id} on another worker")
+                state['retry'].put((seq, job_id, failed_on | {wid}, attempts + 1))
+            else:
+                with state['lock']:
+                    state['results'][seq] = (job_id, skills)
+                    state['lock'].notify_all()
+            if failures >= 3:
+                logging.error(f"Worker {wid} retired after repeated browser errors")
+                break
+    finally:
+        with state['lock']:
+            state['alive'] -= 1
+            state['consumers'] -= 1
+            state['lock'].notify_all()
+
+def _feed(job_ids, work, state, paginator):
+    """Moves job IDs from the (possibly lazy) source into the bounded work queue."""
+    fed = 0
+    try:
+        for job_id in job_ids:
+            item = (fed, job_id, frozenset(), 0)
+            while True:
+                if state['stop'].is_set():
+                    return
+                try:
+                    work.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    with state['lock']:
+                        # Only the paginator is left to empty the queue
+                        stalled = paginator is not None and state['consumers'] == 0
+                    if stalled:
+                        logging.error("All workers stopped, job source abandoned")
+                        return
+            fed += 1
+    except Exception as e:
+        logging.error(f"Job source failed: {e!r}")
+    finally:
+        with state['lock']:
+            state['total'] = fed
+            state['lock'].notify_all()
+
+def _feeder(job_ids, work, state, scrape, paginator):
+    """Feeds the work queue; the browser driven by the source (paginator) then joins the workers."""
+    _feed(job_ids, work, state, paginator)
+    if paginator is None:
+        return
+    with state['lock']:
+        stopped = state['stop'].is_set()
+        if stopped:
+            state['alive'] -= 1
+            state['lock'].notify_all()
+        else:
+            state['consumers'] += 1
+    if not stopped:
+        logging.info("Job source done, its browser joins the workers")
+        _worker(state['workers'], paginator, scrape, work, state)
+
+def run_jobs(browsers, job_ids, scrape, retries=None, paginator=None):
+    """
+    Scrapes jobs across a pool of browsers and yields the results in input order.
+
+    Job IDs are consumed lazily through a bounded queue, so job_ids can be a
+    generator that is still producing (e.g. paginating) while workers scrape.
+
+    Args:
+        browsers (list): Logged in WebDriver instances, one per worker.
+        job_ids (iterable): Job IDs to scrape.
+        scrape (callable): scrape(browser, job_id) returning the skill list,
+            or None when the job should be retried on another worker.
+        retries (int): Number of extra attempts for a failed job.
+        paginator: Browser driven by job_ids, which becomes a worker once
+            job_ids is exhausted. browsers can then be empty.
+
+    Yields:
+        tuple: (job_id, skills) for every job, in the order of job_ids; skills
+        is None for a job that failed on every attempt.
+    """
+    if retries is None:
+        retries = getattr(vars, 'worker_retries', 2)
+    # Nobody consumes while the paginator alone is still paginating
+    maxsize = getattr(vars, 'pipeline_queue_size', 100) if browsers else 0
+    work = queue.Queue(maxsize=maxsize)
+    state = {
+        'lock': threading.Condition(),
+        'stop': threading.Event(),
+        'retry': queue.Queue(),
+        'results': {},
+        'workers': len(browsers),
+        # Live threads that can still scrape, and those scraping now
+        'alive': len(browsers) + (paginator is not None),
+        'consumers': len(browsers),
+        'total': None,
+        'retries': retries,
+    }
+
+    threads = [threading.Thread(target=_feeder, args=(job_ids, work, state, scrape, paginator), name='feeder',
+                                daemon=True)]
+    threads += [
+        threading.Thread(target=_worker, args=(wid, browser, scrape, work, state), name=f'worker-{wid}',
+                         daemon=True)
+        for wid, browser in enumerate(browsers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        seq = 0
+        while True:
+            with state['lock']:
+                while seq not in state['results'] and state['alive'] > 0 and state['total'] != seq:
+                    state['lock'].wait()
+                if seq not in state['results']:
+                    if state['total'] != seq:
+                        logging.error("All workers stopped, extraction incomplete")
+                    return
+                result = state['results'].pop(seq)
+            yield result
+            seq += 1
+    finally:
+        state['stop'].set()
+        _join_threads(threads, [paginator] + list(browsers))
+
+def _join_threads(threads, browsers, timeout=JOIN_TIMEOUT):
+    """
+    Waits for the feeder and the workers to finish their current item.
+
+    threads and browsers are paired; the feeder has no browser of its own
+    unless it paginates.
+
+    A worker still running after timeout seconds has its browser quit, so
+    it is not handed to the next extraction while the thread drives it.
+    """
+    deadline = time.monotonic() + timeout
+    for thread, browser in zip(threads, browsers):
+        thread.join(max(0, deadline - time.monotonic()))
+        if not thread.is_alive():
+            continue
+        if browser is None:
+            logging.warning(f"Job source still busy after {timeout}s")
+        else:
+            logging.warning(f"{thread.name} still busy after {timeout}s, closing its browser")
+            try:
+                quit_browser(browser)
+            except Exception as e:
+                logging.debug(f"Unable to quit busy worker browser: {e}")
@@ -1,18 +1,125 @@
+import os
 import logging
 import ast
+import json
 import re
 import pandas as pd
 
+from itertools import repeat
 from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
+import vars
 from vars import stopwords, ext_folder
-from utils import list_files_in_directory
+from files import list_files_in_directory
+from cache import load_cache, save_cache, lookup, new_entry
+from storage import connect, import_files, canonicalize_skills, query_skill_counts
+from canonical import load_canonicalizer, save_canonicalizer, skill_key
+
+# Loaded on first use and shared by all aggregations of the process
+_canonicalizer = None
 
 def preprocess_skill(skill):
     """Normalizes and cleans a skill string."""
     skill = re.sub(r'\s+', ' ', skill)  # Removes extra spaces
     return skill.strip()  # Removes leading and trailing spaces
 
+@lru_cache(maxsize=None)
+def normalize_skill(skill):
+    """Memoized preprocess_skill: every distinct raw string is normalized once."""
+    return preprocess_skill(skill)
+
+def skill_canonicalizer():
+    """Returns the shared skill canonicalizer, or None when fuzzy_skills is off."""
+    global _canonicalizer
+    if not getattr(vars, 'fuzzy_skills', True):
+        return None
+    if _canonicalizer is None:
+        _canonicalizer = load_canonicalizer(getattr(vars, 'skill_aliases_file', 'skill-aliases.txt'),
+                                            getattr(vars, 'fuzzy_threshold', 0.82))
+    return _canonicalizer
+
+def canonical_skill_id(skill):
+    """
+    Returns the canonical ID of a raw skill, or None for a blank one.
+
+    With fuzzy_skills off the ID is the whitespace normalized string. Counts
+    are merged on IDs, since the display name of a skill can still change
+    while new spellings of it are seen.
+    """
+    canonicalizer = skill_canonicalizer()
+    if canonicalizer is None:
+        return normalize_skill(skill) or None
+    cid = canonicalizer.canonical_id(skill)
+    return cid if cid >= 0 else None
+
+def canonical_name(skill_id):
+    """Returns the display name of a canonical skill ID."""
+    if isinstance(skill_id, str):
+        return skill_id
+    return _canonicalizer.names[skill_id]
+
+def canonical_signature():
+    """Identifies the canonicalization settings and memo, for the caches built on canonical skills."""
+    canonicalizer = skill_canonicalizer()
+    return f"{canonicalizer.signature}@{canonicalizer.created}" if canonicalizer else 'exact'
+
+def save_skill_memo():
+    """Saves the raw to canonical skill memo if new strings were canonicalized."""
+    if _canonicalizer is not None:
+        save_canonicalizer(_canonicalizer)
+
+def stopword_filter(stopwords):
+    """Returns is_stopword(skill): case and spacing insensitive when fuzzy_skills is on."""
+    if skill_canonicalizer() is None:
+        return stopwords.__contains__
+    keys = {skill_key(word) for word in stopwords}
+    return lambda skill: skill_key(skill) in keys
+
+def parse_record(line):
+    """
+    Parses one extraction line into a job record.
+
+    Journal lines are JSON objects; legacy lines are Python list literals
+    and are wrapped into records without metadata.
+
+    Returns:
+        dict: Record with job_id, search_url, timestamp and skills, or None
+        if the line is empty or cannot be parsed.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith('{'):
+            record = json.loads(line)
+        else:
+            record = {'job_id': None, 'search_url': None, 'timestamp': None,
+                      'skills': ast.literal_eval(line)}
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(record, dict) or not isinstance(record.get('skills'), list):
+        return None
+    return record
+
+def read_journal(file_path):
+    """Streams job records from an extraction file, one line at a time."""
+    with open(file_path, 'r') as file:
+        for line in file:
+            record = parse_record(line)
+            if record is None:
+                if line.strip():
+                    logging.warning(f"Unable to parse line in {file_path}: {line.strip()[:80]}")
+                continue
+            yield record
+
+def iter_skill_lists(file_paths):
+    """Yields the skill list of every job found in the given extraction files."""
+    for file_path in file_paths:
+        for record in read_journal(file_path):
+            yield record.get('skills') or []
+
 def process_all_skills(file_path_or_list, stopwords=stopwords):
     """
     Processes all skills from a file or a list and returns the most common skills.
@@ -25,28 +132,62 @@ def process_all_skills(file_path_or_list, stopwords=stopwords):
         pd.DataFrame: DataFrame with all skills, counts, and percentages.
     """
     if isinstance(file_path_or_list, str):
-        # 1. Load Data from file
-        with open(file_path_or_list, 'r') as file:
-            content = file.read()
-        lines = content.split('\n')
-        jobtotal = len(lines)
-        lists_of_strings = [ast.literal_eval(line) for line in lines if line]
+        # 1. Stream Data from file
+        lists_of_strings = iter_skill_lists([file_path_or_list])
     elif isinstance(file_path_or_list, list):
         # Load Data from list
-        lists_of_strings = [item for item in file_path_or_list if item != []]
-        jobtotal = len(lists_of_strings)
+        lists_of_strings = file_path_or_list
     else:
         raise ValueError("file_path_or_list must be either a file path (str) or a list of strings")
 
-    all_strings = []
+    id_counts, jobtotal = count_raw_skills(lists_of_strings)
+
+    # 2. Name the canonical skills and drop stopwords
+    string_counts = fold_skill_counts(id_counts, stopwords)
+    return build_skills_frame(string_counts, jobtotal)
+
+def job_skill_ids(skills):
+    """
+    Returns the canonical IDs of the skills of one job.
+
+    Variants of a skill listed by the same job give one ID, so each
+    canonical skill is counted once per job.
+    """
+    ids = set(map(canonical_skill_id, skills))
+    ids.discard(None)
+    return ids
+
+def count_raw_skills(lists_of_strings):
+    """
+    Counts canonical skills in a single pass over the skill lists.
+
+    Memory is bounded by the number of distinct skills, not by the input.
+
+    Returns:
+        tuple: (Counter of canonical skill IDs, number of jobs with skills)
+    """
+    id_counts = Counter()
+    jobtotal = 0
     for sublist in lists_of_strings:
-        all_strings.extend(sublist)
-    
-    # Preprocess and filter skills
-    all_strings = [preprocess_skill(skill) for skill in all_strings if preprocess_skill(skill) not in stopwords]
-    
-    # 2. Count Frequencies
-    string_counts = Counter(all_strings)
+        # Jobs without skills (e.g. modal not found) are not counted
+        if sublist:
+            jobtotal += 1
+            id_counts.update(job_skill_ids(sublist))
+    return id_counts, jobtotal
+
+def fold_skill_counts(id_counts, stopwords=stopwords):
+    """Names the canonical skill counts, dropping stopwords."""
+    save_skill_memo()
+    is_stopword = stopword_filter(stopwords)
+    string_counts = Counter()
+    for skill_id, count in id_counts.items():
+        skill = canonical_name(skill_id)
+        if not is_stopword(skill):
+            string_counts[skill] += count
+    return string_counts
+
+def build_skills_frame(string_counts, jobtotal):
+    """Builds the sorted Skill/Count/Percentage DataFrame from the skill counts."""
     all_skills_df = pd.DataFrame(string_counts.items(), columns=['Skill', 'Count'])
     all_skills_df['Percentage'] = (all_skills_df['Count'] / jobtotal * 100).round(0).astype(int)
 
@@ -74,7 +215,8 @@ def process_skills_from_file():
         file_index = int(file_choice) - 1
         if 0 <= file_index < len(files):
             file_path = files[file_index]
-            filebuffer = process_all_skills(file_path)
+            id_counts, jobtotal = count_files([file_path])
+            filebuffer = build_skills_frame(fold_skill_counts(id_counts), jobtotal)
             return filebuffer, file_path 
         else:
             logging.warning("Invalid file number.")
@@ -83,46 +225,151 @@ def process_skills_from_file():
         return None
     
 
+def count_file(file_path, raw_sets=False):
+    """
+    Counts the skills of one extraction file (runs in a worker process).
+
+    Args:
+        raw_sets (bool): Count the raw skill set of each job instead of
+            canonical IDs, for the parent to canonicalize with
+            canonical_set_counts. Sets hold indices into the file's list of
+            distinct raw skills, so they are cheap to send back.
+
+    Returns:
+        tuple: (file_path, counts, jobs with skills, records, errors), counts
+        being a Counter of canonical skill IDs, or with raw_sets a
+        (distinct raw skills, Counter of index sets) pair.
+    """
+    counts = Counter()
+    vocabulary = {}
+    jobtotal = records = errors = 0
+    with open(file_path, 'r') as file:
+        for line in file:
+            record = parse_record(line)
+            if record is None:
+                errors += bool(line.strip())
+                continue
+            records += 1
+            if record['skills']:
+                jobtotal += 1
+                if raw_sets:
+                    # Identical sets share one entry
+                    counts[frozenset(vocabulary.setdefault(skill, len(vocabulary)) for skill in record['skills'])] += 1
+                else:
+                    counts.update(job_skill_ids(record['skills']))
+    if raw_sets:
+        counts = (list(vocabulary), counts)
+    return file_path, counts, jobtotal, records, errors
+
+def canonical_set_counts(vocabulary, skill_sets):
+    """Turns the raw skill index sets of count_file(raw_sets=True) into a Counter of canonical skill IDs."""
+    # Each distinct raw skill is canonicalized once
+    skill_ids = [canonical_skill_id(skill) for skill in vocabulary]
+    id_counts = Counter()
+    for skill_set, count in skill_sets.items():
+        ids = {skill_ids[skill] for skill in skill_set}
+        ids.discard(None)
+        if count == 1:
+            id_counts.update(ids)
+        else:
+            for skill_id in ids:
+                id_counts[skill_id] += count
+    return id_counts
+
+def count_files_each(files, workers=None, use_cache=None):
+    """
+    Counts every file independently across a process pool.
+
+    Partial counts are cached per file, so only new or changed files are parsed.
+    Fuzzy canonical IDs depend on the order skills are first seen, so the
+    workers do not assign them: they return the raw skill sets of each file,
+    which are canonicalized here as they arrive and then dropped.
+
+    Returns:
+        list: One (file_path, canonical counts, jobs with skills, records, errors) tuple per file.
+    """
+    if use_cache is None:
+        use_cache = getattr(vars, 'processed_cache', True)
+    signature = canonical_signature()
+    cache = load_cache(signature) if use_cache else {}
+    results = []
+    stale = []
+    dirty = False
+    for file_path in files:
+        entry, refreshed = lookup(cache, file_path)
+        dirty = dirty or refreshed
+        if entry:
+            results.append((file_path, entry['counts'], entry['jobtotal'], entry['records'], entry['errors']))
+        else:
+            stale.append(file_path)
+    logging.info(f"{len(files) - len(stale)} file(s) from cache, {len(stale)} file(s) to parse")
+
+    if workers is None:
+        workers = getattr(vars, 'process_workers', None) or os.cpu_count() or 1
+    workers = min(workers, len(stale))
+    if workers > 1:
+        raw_sets = skill_canonicalizer() is not None
+        parsed = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_path, counts, jobtotal, records, errors in executor.map(count_file, stale, repeat(raw_sets)):
+                if raw_sets:
+                    counts = canonical_set_counts(*counts)
+                parsed.append((file_path, counts, jobtotal, records, errors))
+    else:
+        parsed = [count_file(file) for file in stale]
+    results.extend(parsed)
+
+    if use_cache and (parsed or dirty):
+        # The cached IDs must be known to the saved memo
+        save_skill_memo()
+        for result in parsed:
+            cache[os.path.basename(result[0])] = new_entry(*result)
+        save_cache(cache, signature)
+    return results
+
+def count_files(files, workers=None, use_cache=None):
+    """Counts all files and merges the per-file partial counters."""
+    id_counts = Counter()
+    jobtotal = 0
+    for file_path, file_counts, file_jobs, records, errors in count_files_each(files, workers, use_cache):
+        logging.info(f"{os.path.basename(file_path)}: {records} record(s), {errors} error(s)")
+        id_counts.update(file_counts)
+        jobtotal += file_jobs
+    return id_counts, jobtotal
+
 def process_all_files():
+    """Processes skills from all files in the extraction folder."""
     files = list_files_in_directory(ext_folder)
 
     if not files:
         logging.info("No files found in the directory.")
         return None
 
-    all_files_content = []
-
-    for file in files:
-        with open(file, 'r') as f:
-            content = f.read().replace('\n', '')
-            all_files_content.append(content)
-
-    combined_content = ''.join(all_files_content).replace('][', '],[')
-    list_strings = combined_content.split('],[')
-
-    list_strings = ['[' + s if not s.startswith('[') else s for s in list_strings]
-    list_strings = [s + ']' if not s.endswith(']') else s for s in list_strings]
-
-    valid_lists = []
-    for s in list_strings:
-        stack = []
-        balanced = True
-        for char in s:
-            if char == '[':
-                stack.append(char)
-            elif char == ']':
-                if not stack:
-                    balanced = False
-                    break
-                stack.pop()
-        if balanced and not stack:
-            try:
-                valid_lists.append(ast.literal_eval(s))
-            except SyntaxError:
-                logging.warning(f"Syntax error when parsing: {s}")
-        else:
-            logging.warning(f"Unbalanced brackets in: {s}")
+    id_counts, jobtotal = count_files(files)
+    processed_skills = build_skills_frame(fold_skill_counts(id_counts), jobtotal)
     
-    processed_skills = process_all_skills(valid_lists)
-    
-    return processed_skills
\ No newline at end of file
+    return processed_skills
+
+def process_database(keyword=None, since_days=None, import_new=False):
+    """
+    Processes skills stored in the SQLite database, optionally filtered by keyword and age.
+
+    Args:
+        keyword (str): Search keyword (as in the file names), None for all searches.
+        since_days (int): Only jobs extracted in the last since_days days.
+        import_new (bool): Import the files of the extraction folder not imported yet.
+    """
+    conn = connect()
+    try:
+        if import_new:
+            imported = import_files(conn, list_files_in_directory(ext_folder), read_journal)
+            logging.info(f"{imported} file(s) imported")
+        resolved = canonicalize_skills(conn, canonical_skill_id, canonical_signature())
+        if resolved:
+            logging.info(f"{resolved} new skill(s) canonicalized")
+        id_counts, jobtotal = query_skill_counts(conn, keyword, since_days)
+    finally:
+        conn.close()
+    if not jobtotal:
+        return None
+    return build_skills_frame(fold_skill_counts(id_counts), jobtotal)
\ No newline at end of file
@@ -0,0 +1,186 @@
+import time
+import random
+import logging
+import threading
+
+from collections import deque
+from contextlib import contextmanager
+
+import vars
+from metrics import profiler
+
+# Request outcomes that signal LinkedIn is pushing back
+CONGESTION = ('timeout', 'challenge', 'error')
+
+class TokenBucket:
+    """Rate limiter: rate tokens per second, up to burst tokens saved."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def acquire(self):
+        """Takes a token, waiting for it if the bucket is empty. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class Ticket:
+    """Outcome of a scheduled request: ok, timeout, challenge or error."""
+
+    def __init__(self):
+        self.outcome = 'ok'
+
+class Scheduler:
+    """
+    Paces every page request of the scraper.
+
+    A token bucket limits the request rate and a concurrency limit caps the
+    requests in flight. Both grow additively while requests succeed at
+    normal latency and are halved on timeouts, challenges and errors
+    (AIMD). A worker whose request failed also waits a jittered exponential
+    backoff before its next request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.bucket = None
+        self.max_concurrency = 1
+        self.limit = 1.0
+        self.active = 0
+        self.failures = {}
+        self.resume_at = {}
+        self.latencies = deque(maxlen=50)
+
+    def enabled(self):
+        return getattr(vars, 'adaptive_scheduler', True)
+
+    def configure(self, max_concurrency):
+        """Sets the number of browsers/sessions of the run; the learned rate is kept."""
+        with self.lock:
+            if self.bucket is None:
+                self.bucket = TokenBucket(getattr(vars, 'requests_per_second', 1.0),
+                                          getattr(vars, 'request_burst', 3))
+            self.max_concurrency = max(max_concurrency, 1)
+            self.limit = min(max(self.limit, 1.0), self.max_concurrency)
+            self.failures = {}
+            self.resume_at = {}
+            self.lock.notify_all()
+
+    @contextmanager
+    def widened(self, max_concurrency):
+        """Allows up to max_concurrency requests in flight meanwhile, e.g. for a wave of HTTP page fetches."""
+        if self.bucket is None:
+            self.configure(max_concurrency)
+        with self.lock:
+            previous = self.max_concurrency
+            self.max_concurrency = max(previous, max_concurrency)
+            self.lock.notify_all()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.max_concurrency = previous
+                self.limit = min(self.limit, previous)
+                self.lock.notify_all()
+
+    @contextmanager
+    def request(self, worker):
+        """
+        Waits for the worker's backoff, a concurrency slot and a rate token, then runs the request.
+
+        The caller sets ticket.outcome when the request hit a challenge or
+        another failure; exceptions count as timeouts or errors.
+        """
+        ticket = Ticket()
+        if not self.enabled():
+            yield ticket
+            return
+        if self.bucket is None:
+            self.configure(max(getattr(vars, 'extraction_workers', 1), 1) + 1)
+        key = id(worker)
+        waited = self._enter(key)
+        start = time.monotonic()
+        try:
+            yield ticket
+        except Exception as e:
+            if ticket.outcome == 'ok':
+                ticket.outcome = 'timeout' if 'Timeout' in type(e).__name__ else 'error'
+            raise
+        finally:
+            self._exit(key, ticket.outcome, time.monotonic() - start)
+            profiler.record('scheduler_wait', waited)
+
+    def _enter(self, key):
+        start = time.monotonic()
+        with self.lock:
+            delay = self.resume_at.pop(key, 0) - time.monotonic()
+        if delay > 0:
+            profiler.count('backoffs')
+            logging.info(f"Backing off for {delay:.1f}s")
+            time.sleep(delay)
+        with self.lock:
+            while self.active >= int(self.limit):
+                self.lock.wait()
+            self.active += 1
+        self.bucket.acquire()
+        return time.monotonic() - start
+
+    def _exit(self, key, outcome, latency):
+        with self.lock:
+            self.active -= 1
+            rate = self.bucket.rate
+            if outcome in CONGESTION:
+                if outcome == 'challenge':
+                    profiler.count('challenges')
+                self.failures[key] = self.failures.get(key, 0) + 1
+                backoff = min(getattr(vars, 'backoff_max', 60),
+                              getattr(vars, 'backoff_base', 1) * 2 ** (self.failures[key] - 1))
+                # Full jitter, so the workers do not come back all at once
+                self.resume_at[key] = time.monotonic() + random.uniform(backoff / 2, backoff)
+                self.limit = max(1.0, self.limit / 2)
+                rate = max(getattr(vars, 'min_requests_per_second', 0.2), rate / 2)
+                logging.info(f"Request {outcome}: concurrency {int(self.limit)}, {rate:.2f} request(s)/s")
+            else:
+                self.failures.pop(key, None)
+                baseline = min(self.latencies) if self.latencies else latency
+                self.latencies.append(latency)
+                # Only speed up while latency stays close to the best observed
+                if latency <= baseline * getattr(vars, 'slow_latency_factor', 3):
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                    rate = min(getattr(vars, 'max_requests_per_second', 5.0),
+                               rate + getattr(vars, 'rate_increase', 0.1))
+            self.lock.notify_all()
+        self.bucket.set_rate(rate)
+
+    def status(self):
+        """Returns the current request rate and concurrency limit."""
+        with self.lock:
+            return {
+                'requests_per_second': round(self.bucket.rate, 2) if self.bucket else None,
+                'concurrency': int(self.limit),
+                'max_concurrency': self.max_concurrency,
+            }
+
+# Shared by the browsers and HTTP sessions of a run
+scheduler = Scheduler()
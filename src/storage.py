@@ -0,0 +1,174 @@
+import os
+import time
+import sqlite3
+import logging
+
+import vars
+from vars import ext_folder
+from files import search_keyword, filename_timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    keyword TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT,
+    search_id INTEGER NOT NULL REFERENCES searches(id),
+    extracted_at TEXT,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_row INTEGER NOT NULL REFERENCES jobs(id),
+    skill TEXT NOT NULL,
+    canonical
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_searches_keyword ON searches(keyword);
+CREATE INDEX IF NOT EXISTS idx_jobs_search ON jobs(search_id, extracted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_extracted ON jobs(extracted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source);
+CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills(job_row);
+CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills(skill, job_row);
+"""
+
+def sqlite_enabled():
+    """Checks whether extractions should also be stored in SQLite."""
+    return getattr(vars, 'storage_backend', 'jsonl') == 'sqlite'
+
+def connect(path=None):
+    """Opens the skills database, creating the schema if needed."""
+    if path is None:
+        path = getattr(vars, 'sqlite_file', os.path.join(ext_folder, 'skills.db'))
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(job_skills)")]
+    if 'canonical' not in columns:
+        # Databases created before skills were canonicalized
+        conn.execute("ALTER TABLE job_skills ADD COLUMN canonical")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_skills_canonical ON job_skills(canonical, job_row)")
+    return conn
+
+def normalize_keyword(keyword):
+    """Keywords are stored like in file names, so legacy and new searches match."""
+    return keyword.strip().replace(' ', '-').lower()
+
+def _search_id(conn, url, cache):
+    if url not in cache:
+        conn.execute("INSERT OR IGNORE INTO searches (url, keyword) VALUES (?, ?)",
+                     (url, normalize_keyword(search_keyword(url))))
+        cache[url] = conn.execute("SELECT id FROM searches WHERE url = ?", (url,)).fetchone()[0]
+    return cache[url]
+
+def insert_records(conn, records, source):
+    """Inserts a batch of job records in one transaction; jobs without skills are skipped."""
+    searches = {}
+    with conn:
+        for record in records:
+            if not record.get('skills'):
+                continue
+            search_id = _search_id(conn, record.get('search_url') or '', searches)
+            cursor = conn.execute(
+                "INSERT INTO jobs (job_id, search_id, extracted_at, source) VALUES (?, ?, ?, ?)",
+                (record.get('job_id'), search_id, record.get('timestamp'), source),
+            )
+            conn.executemany(
+                "INSERT INTO job_skills (job_row, skill) VALUES (?, ?)",
+                ((cursor.lastrowid, skill) for skill in record['skills']),
+            )
+
+def import_files(conn, files, read_records, batch_size=1000):
+    """
+    Imports extraction files (journal or legacy .txt) not imported yet.
+
+    Legacy records have no search URL or timestamp, so they are taken from
+    the keyword and time set_filename put in the file name.
+    """
+    imported = 0
+    for file_path in files:
+        source = os.path.basename(file_path)
+        if conn.execute("SELECT 1 FROM jobs WHERE source = ? LIMIT 1", (source,)).fetchone():
+            continue
+        name = os.path.splitext(source)[0]
+        legacy_url = "legacy:?keywords=" + name[18:] if len(name) > 18 else "legacy:"
+        legacy_time = filename_timestamp(file_path)
+        batch = []
+        for record in read_records(file_path):
+            record['search_url'] = record.get('search_url') or legacy_url
+            record['timestamp'] = record.get('timestamp') or legacy_time
+            batch.append(record)
+            if len(batch) >= batch_size:
+                insert_records(conn, batch, source)
+                batch = []
+        insert_records(conn, batch, source)
+        imported += 1
+        logging.info("Imported " + source)
+    return imported
+
+def canonicalize_skills(conn, skill_id, signature):
+    """
+    Fills the canonical column of the skills stored without one.
+
+    Every distinct raw skill is resolved once with skill_id; blank skills are
+    stored as ''. All skills are resolved again when the canonicalization
+    settings (signature) changed.
+
+    Returns:
+        int: Number of distinct skills resolved.
+    """
+    with conn:
+        saved = conn.execute("SELECT value FROM meta WHERE key = 'canonical'").fetchone()
+        if saved is None or saved[0] != signature:
+            conn.execute("UPDATE job_skills SET canonical = NULL")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('canonical', ?)", (signature,))
+        skills = [row[0] for row in conn.execute("SELECT DISTINCT skill FROM job_skills WHERE canonical IS NULL")]
+        conn.executemany(
+            "UPDATE job_skills SET canonical = ? WHERE skill = ? AND canonical IS NULL",
+            ((_canonical_value(skill_id(skill)), skill) for skill in skills),
+        )
+    return len(skills)
+
+def _canonical_value(cid):
+    return '' if cid is None else cid
+
+def _filters(keyword, since_days, clauses=()):
+    clauses = list(clauses)
+    params = []
+    if keyword:
+        clauses.append("s.keyword = ?")
+        params.append(normalize_keyword(keyword))
+    if since_days:
+        since = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(time.time() - since_days * 86400))
+        clauses.append("j.extracted_at >= ?")
+        params.append(since)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
+
+def query_skill_counts(conn, keyword=None, since_days=None):
+    """
+    Counts the jobs of each canonical skill with an indexed GROUP BY query.
+
+    canonicalize_skills must have filled the canonical column first.
+
+    Returns:
+        tuple: (dict of canonical skill ID -> number of jobs, number of jobs)
+    """
+    where, params = _filters(keyword, since_days, ["js.canonical != ''"])
+    rows = conn.execute(
+        "SELECT js.canonical, COUNT(DISTINCT js.job_row) FROM job_skills js "
+        "JOIN jobs j ON j.id = js.job_row JOIN searches s ON s.id = j.search_id"
+        + where + " GROUP BY js.canonical",
+        params,
+    ).fetchall()
+    where, params = _filters(keyword, since_days)
+    jobtotal = conn.execute(
+        "SELECT COUNT(*) FROM jobs j JOIN searches s ON s.id = j.search_id" + where, params
+    ).fetchone()[0]
+    return dict(rows), jobtotal
@@ -0,0 +1,157 @@
+import os
+import pickle
+import logging
+import pandas as pd
+
+from bisect import bisect_left
+
+from vars import stopwords, ext_folder
+from files import list_files_in_directory, state_path, filename_timestamp, search_keyword
+from process import read_journal, count_files_each, fold_skill_counts, canonical_signature
+from storage import normalize_keyword
+
+TRENDS_FILE = 'trends.pickle'
+TRENDS_VERSION = 1
+
+def snapshot_info(file_path):
+    """Returns the (series keyword, ISO timestamp) of an extraction file."""
+    first = next(read_journal(file_path), {})
+    timestamp = filename_timestamp(file_path) or first.get('timestamp')
+    if first.get('search_url'):
+        keyword = search_keyword(first['search_url'])
+    else:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        keyword = name[18:] if len(name) > 18 else 'recommended'
+    return normalize_keyword(keyword), timestamp or ''
+
+def load_trends():
+    """Loads the saved per-snapshot aggregates."""
+    path = state_path(TRENDS_FILE)
+    signature = sorted(stopwords) + ['canonical:' + canonical_signature()]
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as file:
+                state = pickle.load(file)
+            if state.get('version') == TRENDS_VERSION and state.get('stopwords') == signature:
+                return state
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"Rebuilding unreadable trend state: {e}")
+    return {'version': TRENDS_VERSION, 'stopwords': signature, 'series': {}, 'files': {}}
+
+def save_trends(state):
+    path = state_path(TRENDS_FILE)
+    with open(path + '.tmp', 'wb') as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+def _percentages(snapshot):
+    total = max(snapshot['jobtotal'], 1)
+    return {skill: count / total * 100 for skill, count in snapshot['counts'].items()}
+
+def _compute_delta(snapshots, pos):
+    """Sets the percentage point change of snapshot pos against the previous one."""
+    if pos < 0 or pos >= len(snapshots):
+        return
+    if pos == 0:
+        snapshots[pos]['delta'] = None
+        return
+    current = _percentages(snapshots[pos])
+    previous = _percentages(snapshots[pos - 1])
+    snapshots[pos]['delta'] = {
+        skill: current.get(skill, 0) - previous.get(skill, 0)
+        for skill in current.keys() | previous.keys()
+    }
+
+def _remove(state, name):
+    series, _ = state['files'].pop(name)
+    if series is None:
+        # File without jobs, recorded without a snapshot
+        return
+    snapshots = state['series'][series]
+    pos = next(i for i, snapshot in enumerate(snapshots) if snapshot['file'] == name)
+    del snapshots[pos]
+    if snapshots:
+        _compute_delta(snapshots, pos)
+    else:
+        del state['series'][series]
+
+def update_trends(files=None):
+    """
+    Adds new or changed extraction files to the trend state.
+
+    Only the new snapshots and their direct successors are recomputed;
+    the aggregates of the history come from the saved state.
+    """
+    if files is None:
+        files = list_files_in_directory(ext_folder)
+    state = load_trends()
+    current = {}
+    for file_path in files:
+        stat = os.stat(file_path)
+        current[os.path.basename(file_path)] = (file_path, (stat.st_size, stat.st_mtime_ns))
+
+    removed = [name for name in state['files'] if name not in current]
+    for name in removed:
+        _remove(state, name)
+    changed = [path for name, (path, signature) in current.items()
+               if state['files'].get(name, (None, None))[1] != signature]
+    if not changed:
+        if removed:
+            save_trends(state)
+        return state
+
+    added = 0
+    for file_path, id_counts, jobtotal, records, errors in count_files_each(changed):
+        name = os.path.basename(file_path)
+        if name in state['files']:
+            _remove(state, name)
+        if not jobtotal:
+            # Remembered, so the file is not parsed again on every run
+            state['files'][name] = (None, current[name][1])
+            continue
+        series, timestamp = snapshot_info(file_path)
+        snapshots = state['series'].setdefault(series, [])
+        snapshot = {
+            'file': name,
+            'time': timestamp,
+            'jobtotal': jobtotal,
+            'counts': dict(fold_skill_counts(id_counts)),
+            'delta': None,
+        }
+        pos = bisect_left([s['time'] for s in snapshots], timestamp)
+        snapshots.insert(pos, snapshot)
+        _compute_delta(snapshots, pos)
+        _compute_delta(snapshots, pos + 1)
+        state['files'][name] = (series, current[name][1])
+        added += 1
+    logging.info(f"{added} snapshot(s) added to the trends")
+    save_trends(state)
+    return state
+
+def trend_table(state):
+    """Returns the time series: one row per series, snapshot and skill."""
+    rows = []
+    for series, snapshots in sorted(state['series'].items()):
+        for snapshot in snapshots:
+            percentages = _percentages(snapshot)
+            delta = snapshot['delta'] or {}
+            for skill in percentages.keys() | delta.keys():
+                rows.append((series, snapshot['time'], skill, snapshot['counts'].get(skill, 0),
+                             round(percentages.get(skill, 0)), round(delta[skill], 1) if skill in delta else None))
+    df = pd.DataFrame(rows, columns=['Series', 'Snapshot', 'Skill', 'Count', 'Percentage', 'Delta'])
+    return df.sort_values(by=['Series', 'Snapshot', 'Count'], ascending=[True, True, False]).reset_index(drop=True)
+
+def movers(state, top=20):
+    """Returns the most rising and falling skills of the latest snapshot of every series."""
+    rows = []
+    for series, snapshots in state['series'].items():
+        if not snapshots:
+            continue
+        latest = snapshots[-1]
+        percentages = _percentages(latest)
+        for skill, delta in (latest['delta'] or {}).items():
+            rows.append((series, latest['time'], skill, round(percentages.get(skill, 0)), round(delta, 1)))
+    df = pd.DataFrame(rows, columns=['Series', 'Snapshot', 'Skill', 'Percentage', 'Delta'])
+    rising = df[df['Delta'] > 0].sort_values(by='Delta', ascending=False).groupby('Series').head(top)
+    falling = df[df['Delta'] < 0].sort_values(by='Delta').groupby('Series').head(top)
+    return rising.reset_index(drop=True), falling.reset_index(drop=True)
@@ -1,23 +1,61 @@
-import time
 import json
 import os
 import logging
-import re
 
-from urllib.parse import parse_qs, urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import WebDriverException
-from openpyxl import load_workbook
 
-from navigation import navigate_to_login, perform_login, handle_checkpoint, wait_for_page_load
-from vars import exp_folder, ext_folder
+from navigation import navigate_to_login, perform_login, handle_checkpoint, load_page, site_url
+from files import state_path
+import vars
+
+# Resource types not needed for scraping, blocked through DevTools
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*doubleclick.net*', '*google-analytics.com*', '*googletagmanager.com*',
+    '*px.ads.linkedin.com*', '*/li/track*', '*/sensorCollect*',
+]
+
+def chrome_driver_path(refresh=False):
+    """Returns the chromedriver path, resolved by ChromeDriverManager once and then cached."""
+    cache = state_path('chromedriver-path')
+    if not refresh and os.path.exists(cache):
+        with open(cache, 'r') as file:
+            path = file.read().strip()
+        if os.path.exists(path):
+            return path
+    path = ChromeDriverManager().install()
+    with open(cache, 'w') as file:
+        file.write(path)
+    return path
+
+def chrome_options():
+    """Builds the Chrome options: eager page loads, optional headless mode and no image loading."""
+    options = webdriver.ChromeOptions()
+    # get() returns at DOMContentLoaded; load_page bounds and waits for the rest per stage
+    options.page_load_strategy = 'eager'
+    if getattr(vars, 'headless', False):
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+    if getattr(vars, 'block_resources', True):
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return options
 
 def initiate_browser():
     """Initializes the Chrome browser."""
     try:
-        browser = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()))
+        try:
+            browser = webdriver.Chrome(service=ChromeService(chrome_driver_path()), options=chrome_options())
+        except WebDriverException:
+            # The cached driver may not match an updated Chrome anymore
+            browser = webdriver.Chrome(service=ChromeService(chrome_driver_path(refresh=True)), options=chrome_options())
+        if getattr(vars, 'block_resources', True):
+            browser.execute_cdp_cmd('Network.enable', {})
+            browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
         logging.info("New Chrome Driver Started")
         return browser
     except WebDriverException as e:
@@ -26,11 +64,11 @@ def initiate_browser():
 
 def handle_login(browser, cookies_file):
     """Handles the login process and loads cookies if available."""
-    browser.get("https://www.linkedin.com")
+    load_page(browser, site_url(), 'login_page')
     if os.path.exists(cookies_file):
         load_cookies(browser, cookies_file)
-        browser.refresh()
-        wait_for_page_load(browser)
+        # Reload with the session cookies
+        load_page(browser, site_url(), 'login_page')
     else:
         navigate_to_login(browser)
         perform_login(browser)
@@ -54,90 +92,6 @@ def load_cookies(browser, filepath):
                 del cookie['sameSite']
             browser.add_cookie(cookie)
 
-def set_job_url(default_url):
-    domain = "linkedin.com"
-    required_params = ["geoId", "keywords"]
-    
-    job_url = input("\nSet URL (Enter for default): ")
-    if job_url:
-        parsed_url = urlparse(job_url)
-        if re.search(domain, parsed_url.netloc):
-            query_params = parse_qs(parsed_url.query)
-            if all(param in query_params for param in required_params):
-                logging.info("URL updated")
-                return job_url
-        logging.warning("Invalid URL. Fallback to default")
-        return default_url
-    else:
-        logging.info("Fallback to default")
-        return default_url
-
 def quit_browser(browser):
     """Quits the browser."""
     browser.quit()
-
-def set_filename(url):
-    t = time.localtime()
-    current_time = time.strftime('%d-%m-%y_%H:%M:%S', t)
-    filename = current_time
-    parsed_url = urlparse(url)
-    query_params = parse_qs(parsed_url.query)
-    if 'keywords' in query_params:
-        filename = filename + "-" + query_params['keywords'][0]
-    else:
-        filename = filename + "-" + "recommended"
-    filename = filename.replace(' ', '-')
-    filename = filename + '.txt'
-    return filename
-
-def file_save(filename, data):
-    with open(ext_folder + filename, 'a') as file:
-        for item in data:
-            if item == "[]":
-                continue
-            file.write(f"{item}\n")
-
-def set_excelname(url):
-    filename = time.strftime('%d-%m-%y_%H:%M:%S', time.localtime())
-    parsed_url = urlparse(url)
-    query_params = parse_qs(parsed_url.query)
-    if 'keywords' in query_params:
-        filename = filename + "_" + query_params['keywords'][0]
-        filename = filename + ".xlsx"
-    else:
-        filename = filename + "_" + url
-        filename = filename.replace(ext_folder, '')
-        filename = filename.replace('.txt','')
-    filename = filename.replace(' ', '-')
-    filename = exp_folder + filename + '.xlsx'
-    return filename
-
-def list_files_in_directory(directory):
-    """Lists files in the given directory and returns a list of file paths."""
-    files = os.listdir(directory)
-    files = [os.path.join(directory, f) for f in files if os.path.isfile(os.path.join(directory, f))]
-    return files
-
-def save_to_excel(df, url, numjobs):
-    file_name = set_excelname(url)
-    df['Percentage'] = df['Percentage'] / 100
-
-    # Save DataFrame to Excel
-    df.to_excel(file_name, index=False, engine='openpyxl')
-
-    # Load the workbook and select the active sheet
-    wb = load_workbook(file_name)
-    ws = wb.active
-    
-    ws.insert_rows(1)
-    ws['A1'] = f"Number of jobs: {numjobs}"
-
-    for cell in ws['A'][2:]:
-        cell.number_format = '@'
-    for cell in ws['B'][2:]:
-        cell.number_format = '0'
-    for cell in ws['C'][2:]:
-        cell.number_format = '0%'
-    
-    # Save the workbook
-    wb.save(file_name)
\ No newline at end of file
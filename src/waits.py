@@ -0,0 +1,129 @@
+import time
+import logging
+import threading
+
+from collections import deque
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import vars
+
+class AdaptiveTimeout:
+    """
+    Timeout for a stage, learned from the latencies recently observed for it.
+
+    A wait that times out is recorded too: its timeout is a lower bound of
+    the latency (censored sample), and the timeout is doubled until waits
+    succeed again, so it can recover when the site slows down.
+    """
+
+    def __init__(self, initial, minimum=2, maximum=30, factor=3, window=50):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.samples = deque(maxlen=window)
+        self.escalated = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            # Back to the learned value gradually, the slow samples take a while to reach the p95
+            self.escalated /= 2
+
+    def record_timeout(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.escalated = min(max(self.escalated, seconds) * 2, self.maximum)
+
+    def value(self):
+        """Returns factor times the p95 of the recent samples (or the doubled timeout), within [minimum, maximum]."""
+        with self.lock:
+            samples = sorted(self.samples)
+            escalated = self.escalated
+        if len(samples) < 5:
+            learned = self.initial
+        else:
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            learned = p95 * self.factor
+        return min(max(learned, escalated, self.minimum), self.maximum)
+
+_timeouts = {}
+_timeouts_lock = threading.Lock()
+
+def stage_timeout(stage, initial=10):
+    """Returns the current timeout for a stage."""
+    with _timeouts_lock:
+        if stage not in _timeouts:
+            _timeouts[stage] = AdaptiveTimeout(initial, maximum=getattr(vars, 'max_wait_timeout', 30))
+        timeout = _timeouts[stage]
+    return timeout.value() if getattr(vars, 'adaptive_timeouts', True) else timeout.initial
+
+def record_latency(stage, seconds):
+    """Feeds an observed latency to the adaptive timeout of a stage."""
+    stage_timeout(stage)
+    _timeouts[stage].record(seconds)
+
+def record_timeout(stage, seconds):
+    """Feeds a wait of the stage that timed out after seconds to its adaptive timeout."""
+    stage_timeout(stage)
+    _timeouts[stage].record_timeout(seconds)
+
+class count_is_stable:
+    """Expected condition: the script's count is non-zero and unchanged for settle seconds."""
+
+    def __init__(self, script, settle=0.3):
+        self.script = script
+        self.settle = settle
+        self.last = None
+        self.since = None
+
+    def __call__(self, driver):
+        count = driver.execute_script(self.script)
+        now = time.monotonic()
+        if count != self.last:
+            self.last = count
+            self.since = now
+            return False
+        if count > 0 and now - self.since >= self.settle:
+            return count
+        return False
+
+def wait_for_stable_count(browser, script, stage, settle=0.3):
+    """Waits until the count returned by script stops changing, feeding the stage timeout."""
+    start = time.monotonic()
+    timeout = stage_timeout(stage)
+    try:
+        count = WebDriverWait(browser, timeout, poll_frequency=0.1).until(
+            count_is_stable(script, settle)
+        )
+    except TimeoutException:
+        record_timeout(stage, timeout)
+        raise
+    record_latency(stage, time.monotonic() - start)
+    return count
+
+def wait_for_url_exit(browser, fragment, poll=1, timeout=None):
+    """
+    Blocks until the current URL no longer contains fragment, checking every poll seconds.
+
+    Raises:
+        TimeoutException: The URL still contains fragment after timeout seconds (None waits forever).
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wait = 60 if deadline is None else min(60, deadline - time.monotonic())
+        if wait <= 0:
+            raise TimeoutException(f"Still on {fragment} after {timeout}s")
+        try:
+            WebDriverWait(browser, wait, poll_frequency=poll).until(
+                lambda driver: fragment not in driver.current_url
+            )
+            return
+        except TimeoutException:
+            logging.info("Still waiting for " + fragment + " to be solved")
+        except WebDriverException as e:
+            logging.error(f"Browser unavailable while waiting: {e}")
+            raise
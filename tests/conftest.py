@@ -0,0 +1,21 @@
+"""
+Test setup: src and benchmarks are made importable with a throwaway vars.py.
+
+The configuration is written by benchmarks/common.use_vars into a temporary
+folder, so the user's src/vars.py, extractions and cookies are not touched.
+"""
+import os
+import sys
+import json
+import tempfile
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+sys.path.insert(0, BENCHMARKS)
+
+from common import use_vars
+
+FOLDER = tempfile.mkdtemp(prefix='skilledin-tests-')
+# Requests are not paced, the tests only talk to the local fixture server
+SETTINGS = use_vars(FOLDER, adaptive_scheduler=False, job_index_ttl_days=0)
+with open(SETTINGS['cookies_file'], 'w') as file:
+    json.dump([{'name': 'li_at', 'value': 'fixture', 'path': '/'}], file)
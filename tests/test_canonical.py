@@ -0,0 +1,113 @@
+"""Skill canonicalization: spelling variants merged, versions and short keys kept apart, and the saved memo."""
+import re
+import pickle
+import random
+
+import pytest
+
+from canonical import Canonicalizer, load_canonicalizer, save_canonicalizer, skill_key, trigrams, dice
+
+def same(canonicalizer, *skills):
+    return len({canonicalizer.canonical_id(skill) for skill in skills}) == 1
+
+@pytest.mark.parametrize('skills', [
+    ('Python', 'python', 'Python (Programming Language)'),
+    ('Python (Programming Language)', 'python', 'Python'),
+    ('AWS', 'Amazon Web Services (AWS)', 'Amazon Web Services'),
+    ('Amazon Web Services (AWS)', 'AWS', 'Amazon Web Services'),
+    ('Node.js', 'NodeJS', 'node js'),
+    ('Machine Learning', 'machine-learning', 'Machine  Learning', 'Machine Learnig'),
+])
+def test_variants_share_one_skill(skills):
+    assert same(Canonicalizer(), *skills)
+
+def test_capitalized_name_is_kept():
+    canonicalizer = Canonicalizer()
+    canonicalizer.canonical('python')
+    assert canonicalizer.canonical('Python') == 'Python'
+    assert canonicalizer.canonical('python') == 'Python'
+
+def test_versions_stay_apart():
+    canonicalizer = Canonicalizer()
+    assert not same(canonicalizer, 'Python 2', 'Python 3')
+    assert not same(canonicalizer, 'Angular 2', 'Angular 12')
+
+def test_short_keys_only_match_exactly():
+    canonicalizer = Canonicalizer()
+    assert not same(canonicalizer, 'AWS', 'AWT')
+    assert not same(canonicalizer, 'Java', 'Jav')
+    assert same(canonicalizer, 'AWS', 'aws')
+
+def test_acronym_parts_join_the_full_form():
+    canonicalizer = Canonicalizer()
+    cid = canonicalizer.canonical_id('Structured Query Language (SQL)')
+    assert canonicalizer.canonical_id('SQL') == cid
+    assert canonicalizer.canonical_id('Structured Query Language') == cid
+    # A qualifier is not an abbreviation of the skill
+    assert not same(canonicalizer, 'Python (Programming Language)', 'Programming Language')
+
+def test_aliases_force_merges():
+    canonicalizer = Canonicalizer([('Kubernetes', ['k8s', 'kube'])])
+    assert same(canonicalizer, 'Kubernetes', 'K8s', 'kube')
+    assert canonicalizer.canonical('k8s') == 'Kubernetes'
+
+def test_blank_skill_has_no_id():
+    assert Canonicalizer().canonical_id('  ') == -1
+    assert Canonicalizer().canonical(' ') == ''
+
+def brute_force_score(canonicalizer, key):
+    """Best similarity of a key among all indexed keys, without the prefix and length filters."""
+    grams = trigrams(key)
+    digits = set(re.findall(r'\d+', key))
+    scores = [dice(grams, trigrams(other)) for other in canonicalizer.keys
+              if set(re.findall(r'\d+', other)) == digits]
+    best = max(scores, default=0)
+    return best if best >= canonicalizer.threshold else None
+
+def test_prefix_and_length_filters_lose_no_match():
+    rng = random.Random(7)
+    words = ['data', 'cloud', 'engineer', 'analysis', 'design', 'python', 'service', 'network', 'security', 'testing']
+    canonicalizer = Canonicalizer()
+    for _ in range(300):
+        canonicalizer.canonical_id(' '.join(rng.sample(words, rng.randint(1, 3))))
+    for _ in range(300):
+        skill = ' '.join(rng.sample(words, rng.randint(1, 3)))
+        if rng.random() < 0.5:
+            cut = rng.randrange(len(skill))
+            skill = skill[:cut] + skill[cut + 1:]
+        key = skill_key(skill)
+        if len(key) < 5:
+            continue
+        cid = canonicalizer._fuzzy(key)
+        best = brute_force_score(canonicalizer, key)
+        assert (cid is None) == (best is None), skill
+        if cid is not None:
+            cluster = [other for other in canonicalizer.keys if canonicalizer.key_ids[other] == cid]
+            assert max(dice(trigrams(key), trigrams(other)) for other in cluster) == best
+
+SKILLS = ['Python', 'python', 'Python (Programming Language)', 'AWS', 'Amazon Web Services (AWS)',
+          'Node.js', 'Python 3', 'Structured Query Language (SQL)', 'Machine Learning']
+
+def test_reloaded_memo_returns_the_same_ids():
+    canonicalizer = Canonicalizer()
+    ids = {skill: canonicalizer.canonical_id(skill) for skill in SKILLS}
+    reloaded = pickle.loads(pickle.dumps(canonicalizer))
+    assert not reloaded.dirty
+    assert reloaded.created == canonicalizer.created
+    assert {skill: reloaded.canonical_id(skill) for skill in SKILLS} == ids
+    assert not reloaded.dirty
+    # New spellings resolve through the rebuilt indexes
+    assert reloaded.canonical_id('NodeJS') == ids['Node.js']
+    assert reloaded.canonical_id('SQL') == ids['Structured Query Language (SQL)']
+    assert reloaded.canonical_id('Machine Learnig') == ids['Machine Learning']
+    assert reloaded.canonical_id('Python 2') not in ids.values()
+
+def test_saved_memo_is_loaded_for_the_same_settings():
+    canonicalizer = load_canonicalizer(None, 0.8)
+    ids = [canonicalizer.canonical_id(skill) for skill in SKILLS]
+    save_canonicalizer(canonicalizer)
+    loaded = load_canonicalizer(None, 0.8)
+    assert loaded.created == canonicalizer.created
+    assert [loaded.canonical_id(skill) for skill in SKILLS] == ids
+    # Another threshold starts a new memo
+    assert load_canonicalizer(None, 0.9).created != canonicalizer.created
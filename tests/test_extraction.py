@@ -0,0 +1,71 @@
+"""Pagination by clicking Next: the end of the results versus a page that did not load."""
+import pytest
+
+from selenium.common.exceptions import TimeoutException
+
+import extraction
+
+class FakeButton:
+    def __init__(self):
+        self.clicks = 0
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.clicks += 1
+
+class FakeBrowser:
+    def __init__(self):
+        self.page = 0
+        self.button = FakeButton()
+        self.current_url = 'http://fixture/jobs/search/'
+
+    def find_element(self, by, value):
+        return self.button
+
+    def find_elements(self, by, value):
+        return [self.button]
+
+    def execute_script(self, script, *args):
+        return [f"{self.page}-{i}" for i in range(2)]
+
+class NoActions:
+    def __init__(self, browser):
+        pass
+
+    def move_to_element(self, element):
+        return self
+
+    def perform(self):
+        pass
+
+@pytest.fixture
+def browser(monkeypatch):
+    monkeypatch.setattr(extraction, 'ActionChains', NoActions)
+    return FakeBrowser()
+
+def test_next_page_load_timeout_is_not_the_end_of_results(browser, monkeypatch):
+    def wait_for_page_load(browser, stage, timeout=None, ready_states=('complete',), start=None):
+        raise TimeoutException("page load")
+
+    monkeypatch.setattr(extraction, 'wait_for_page_load', wait_for_page_load)
+    with pytest.raises(TimeoutException):
+        extraction.go_to_next_page(browser)
+    assert browser.button.clicks == 1
+
+def test_iter_job_ids_raises_when_a_next_page_does_not_load(browser, monkeypatch):
+    def wait_for_page_load(browser, stage, timeout=None, ready_states=('complete',), start=None):
+        browser.page += 1
+        if browser.page == 2:
+            raise TimeoutException("page load")
+
+    monkeypatch.setattr(extraction, 'wait_for_page_load', wait_for_page_load)
+    found = []
+    with pytest.raises(TimeoutException):
+        for job_id in extraction.iter_job_ids(browser):
+            found.append(job_id)
+    assert found == ['0-0', '0-1', '1-0', '1-1']
@@ -0,0 +1,139 @@
+"""HTTP fast path: parsers and the None-means-fallback contract, against the fixture server."""
+import pytest
+import requests
+
+import vars
+from fetch import (
+    new_session, fetch_job_skills, fetch_job_ids, parse_skills_html, parse_skills_json, parse_job_ids_html
+)
+from fixture_server import FixtureConfig, start_server
+
+@pytest.fixture(scope='module')
+def server():
+    config = FixtureConfig(jobs=30, page_size=10, missing_rate=0.3, inline_modal=True, seed=1)
+    server = start_server(config)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def session(server, monkeypatch):
+    monkeypatch.setattr(vars, 'linkedin_url', server.url, raising=False)
+    session = new_session(vars.cookies_file, pool_size=2)
+    yield session
+    session.close()
+
+def jobs_by_details(config):
+    with_details = [job_id for job_id in config.job_ids if config.has_details(job_id)]
+    without_details = [job_id for job_id in config.job_ids if not config.has_details(job_id)]
+    assert with_details and without_details
+    return with_details, without_details
+
+def test_parse_skills_html_reads_fixture_job_pages(server):
+    with_details, _ = jobs_by_details(server.config)
+    for job_id in with_details[:5]:
+        html = requests.get(f"{server.url}/jobs/view/{job_id}").text
+        assert parse_skills_html(html) == server.config.job_skills(job_id)
+
+def test_parse_skills_html_takes_the_second_div_of_each_item():
+    html = """
+    <div class="artdeco-modal job-details-skill-match-modal__content"><ul>
+      <li><div><img src="icon.svg"></div><div> <span>Amazon Web Services</span>
+          <span>(AWS)</span> </div><div>Ignored</div></li>
+      <li><div></div><div>C++ &amp; CUDA</div></li>
+      <li><div></div><div>   </div></li>
+    </ul></div>
+    <ul><li><div></div><div>Outside the modal</div></li></ul>
+    """
+    assert parse_skills_html(html) == ['Amazon Web Services (AWS)', 'C++ & CUDA']
+
+def test_parse_skills_html_without_modal():
+    assert parse_skills_html("<html><body><h1>Job</h1></body></html>") == []
+
+def test_parse_skills_json_finds_skill_keys_at_any_depth():
+    data = {
+        'data': {'job': {'skills': [{'name': ' Python '}, {'skillName': 'SQL'}, 'Docker', {'id': 1}]}},
+        'included': [{'skill': {'name': 'Kubernetes'}}, {'title': 'Not a skill'}],
+    }
+    assert parse_skills_json(data) == ['Python', 'SQL', 'Docker', 'Kubernetes']
+
+def test_parse_job_ids_html_tells_empty_list_from_missing_list():
+    assert parse_job_ids_html('<ul class="scaffold-layout__list-container">'
+                              '<li data-occludable-job-id="1"></li><li>ad</li></ul>') == ['1']
+    assert parse_job_ids_html('<ul class="scaffold-layout__list-container"></ul>') == []
+    assert parse_job_ids_html('<div id="app">Loading</div>') is None
+
+def test_fetch_job_skills_matches_fixture(server, session):
+    with_details, _ = jobs_by_details(server.config)
+    for job_id in with_details:
+        assert fetch_job_skills(session, job_id) == server.config.job_skills(job_id)
+
+def test_fetch_job_skills_returns_none_without_modal(server, session):
+    _, without_details = jobs_by_details(server.config)
+    assert fetch_job_skills(session, without_details[0]) is None
+
+def test_fetch_job_skills_returns_none_on_http_errors(server, session):
+    # Unknown job: 404
+    assert fetch_job_skills(session, '1') is None
+    server.config.failure_rate = 1.0
+    try:
+        assert fetch_job_skills(session, server.config.job_ids[0]) is None
+    finally:
+        server.config.failure_rate = 0.0
+
+def test_fetch_job_skills_returns_none_when_unreachable(session, monkeypatch):
+    monkeypatch.setattr(vars, 'linkedin_url', 'http://127.0.0.1:9', raising=False)
+    assert fetch_job_skills(session, '4000000000', timeout=2) is None
+
+def test_fetch_job_ids_reads_offset_pages(server, session):
+    search = server.search_url()
+    assert fetch_job_ids(session, search + '&start=0') == server.config.job_ids[:10]
+    assert fetch_job_ids(session, search + '&start=20') == server.config.job_ids[20:]
+    # Past the last page the list is still there, only empty
+    assert fetch_job_ids(session, search + '&start=30') == []
+    # A page without the result list means falling back to the browser
+    assert fetch_job_ids(session, server.url + '/feed/') is None
+
+def test_job_scraper_uses_browser_only_when_fetch_fails(server, session, monkeypatch):
+    import extraction
+
+    visited = []
+
+    def scrape_job(browser, job_id):
+        visited.append(job_id)
+        return ['From browser']
+
+    monkeypatch.setattr(extraction, 'scrape_job', scrape_job)
+    scrape = extraction.job_scraper({}, session)
+    with_details, without_details = jobs_by_details(server.config)
+    assert scrape('browser', with_details[0]) == server.config.job_skills(with_details[0])
+    assert visited == []
+    assert scrape('browser', without_details[0]) == ['From browser']
+    assert visited == [without_details[0]]
+
+def test_job_scraper_turns_the_fast_path_off_after_repeated_fallbacks(server, session, monkeypatch):
+    import extraction
+
+    fetched = []
+
+    def fetch_job_skills(session, job_id, worker=None):
+        fetched.append(job_id)
+        return None
+
+    monkeypatch.setattr(vars, 'http_fast_path_max_fallbacks', 3, raising=False)
+    monkeypatch.setattr(extraction, 'fetch_job_skills', fetch_job_skills)
+    monkeypatch.setattr(extraction, 'scrape_job', lambda browser, job_id: ['From browser'])
+    scrape = extraction.job_scraper({}, session)
+    for job_id in range(6):
+        assert scrape('browser', job_id) == ['From browser']
+    assert fetched == [0, 1, 2]
+
+def test_session_keeps_a_connection_alive_with_an_empty_pool(server, monkeypatch):
+    monkeypatch.setattr(vars, 'linkedin_url', server.url, raising=False)
+    session = new_session(vars.cookies_file, pool_size=0)
+    try:
+        adapter = session.get_adapter(server.url)
+        assert adapter._pool_maxsize == 1
+        assert adapter._pool_connections == 1
+    finally:
+        session.close()
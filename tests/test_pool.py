@@ -0,0 +1,110 @@
+"""Worker pool: result order, retries, worker retirement and early close, with fake browsers."""
+import time
+import random
+import threading
+
+from pool import run_jobs
+
+class FakeBrowser:
+    def __init__(self, name):
+        self.name = name
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+    def __repr__(self):
+        return self.name
+
+def browsers(count):
+    return [FakeBrowser(f"b{i}") for i in range(count)]
+
+def recorder(result):
+    """Returns scrape(browser, job_id) giving result(browser, job_id), and the (browser, job_id) calls."""
+    calls = []
+    lock = threading.Lock()
+
+    def scrape(browser, job_id):
+        with lock:
+            calls.append((browser.name, job_id))
+        return result(browser, job_id)
+    return scrape, calls
+
+def pool_threads():
+    return [thread for thread in threading.enumerate()
+            if thread.name == 'feeder' or thread.name.startswith('worker-')]
+
+def test_results_come_back_in_input_order():
+    rng = random.Random(1)
+
+    def result(browser, job_id):
+        time.sleep(rng.random() / 100)
+        return [f"skill-{job_id}"]
+
+    scrape, calls = recorder(result)
+    job_ids = list(range(40))
+    results = list(run_jobs(browsers(4), iter(job_ids), scrape, retries=0))
+    assert results == [(job_id, [f"skill-{job_id}"]) for job_id in job_ids]
+    assert len({name for name, _ in calls}) > 1
+    assert not pool_threads()
+
+def test_empty_skill_list_is_not_retried():
+    scrape, calls = recorder(lambda browser, job_id: [])
+    assert list(run_jobs(browsers(2), ['1'], scrape, retries=2)) == [('1', [])]
+    assert len(calls) == 1
+
+def test_failed_job_moves_to_another_worker_and_stops_at_the_cap():
+    scrape, calls = recorder(lambda browser, job_id: None)
+    assert list(run_jobs(browsers(3), ['1'], scrape, retries=2)) == [('1', None)]
+    assert len(calls) == 3
+    assert len({name for name, _ in calls}) == 3
+
+def test_single_worker_retries_are_capped():
+    scrape, calls = recorder(lambda browser, job_id: None)
+    assert list(run_jobs(browsers(1), ['1', '2'], scrape, retries=1)) == [('1', None), ('2', None)]
+    assert calls == [('b0', '1'), ('b0', '1'), ('b0', '2'), ('b0', '2')]
+
+def test_worker_retires_after_repeated_errors():
+    def result(browser, job_id):
+        if browser.name == 'b0':
+            raise RuntimeError("chromedriver gone")
+        time.sleep(0.01)
+        return [job_id]
+
+    scrape, calls = recorder(result)
+    job_ids = [str(i) for i in range(60)]
+    results = list(run_jobs(browsers(2), job_ids, scrape, retries=2))
+    assert results == [(job_id, [job_id]) for job_id in job_ids]
+    assert len([call for call in calls if call[0] == 'b0']) == 3
+
+def test_pool_ends_when_every_worker_retired():
+    def result(browser, job_id):
+        raise RuntimeError("chromedriver gone")
+
+    scrape, calls = recorder(result)
+    results = list(run_jobs(browsers(1), [str(i) for i in range(10)], scrape, retries=0))
+    # Each failure is final without retries; the worker retires on the third
+    assert results == [('0', None), ('1', None), ('2', None)]
+    assert len(calls) == 3
+    assert not pool_threads()
+
+def test_close_stops_the_workers_and_the_source():
+    fed = []
+
+    def job_ids():
+        for i in range(1000):
+            fed.append(i)
+            yield i
+
+    scrape, calls = recorder(lambda browser, job_id: [job_id])
+    pool = browsers(2)
+    scraped = run_jobs(pool, job_ids(), scrape, retries=0)
+    assert [next(scraped) for _ in range(3)] == [(0, [0]), (1, [1]), (2, [2])]
+    scraped.close()
+    assert not pool_threads()
+    count = len(calls)
+    time.sleep(0.3)
+    assert len(calls) == count
+    assert len(fed) < 1000
+    # Idle workers keep their browsers for the next extraction
+    assert all(browser.quit_calls == 0 for browser in pool)
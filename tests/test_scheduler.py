@@ -0,0 +1,47 @@
+"""Request scheduler: concurrency cap while a wave of HTTP page fetches is widened."""
+import time
+import threading
+
+import vars
+from scheduler import Scheduler
+
+def max_in_flight(scheduler, requests, seconds=0.05):
+    """Runs requests concurrent requests through the scheduler and returns the most seen in flight at once."""
+    state = {'active': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def request(worker):
+        with scheduler.request(worker):
+            with lock:
+                state['active'] += 1
+                state['max'] = max(state['max'], state['active'])
+            time.sleep(seconds)
+            with lock:
+                state['active'] -= 1
+
+    threads = [threading.Thread(target=request, args=(object(),)) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return state['max']
+
+def fast_scheduler(monkeypatch, max_concurrency):
+    monkeypatch.setattr(vars, 'adaptive_scheduler', True, raising=False)
+    monkeypatch.setattr(vars, 'requests_per_second', 100.0, raising=False)
+    monkeypatch.setattr(vars, 'request_burst', 100, raising=False)
+    scheduler = Scheduler()
+    scheduler.configure(max_concurrency)
+    return scheduler
+
+def test_requests_are_capped_by_the_configured_concurrency(monkeypatch):
+    scheduler = fast_scheduler(monkeypatch, 1)
+    assert max_in_flight(scheduler, 8) == 1
+
+def test_widened_allows_concurrent_requests_and_restores_the_cap(monkeypatch):
+    scheduler = fast_scheduler(monkeypatch, 1)
+    with scheduler.widened(4):
+        # The limit grows additively as requests succeed, up to the widened cap
+        assert max_in_flight(scheduler, 16) > 1
+    assert scheduler.status()['max_concurrency'] == 1
+    assert scheduler.status()['concurrency'] == 1
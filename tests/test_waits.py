@@ -0,0 +1,71 @@
+"""Adaptive timeouts: learning from latencies, recovering after timeouts, and page loads bounded per stage."""
+import pytest
+
+from selenium.common.exceptions import TimeoutException
+
+import waits
+from waits import AdaptiveTimeout
+from navigation import load_page
+
+def test_timeout_follows_the_observed_latency():
+    timeout = AdaptiveTimeout(10)
+    assert timeout.value() == 10
+    for _ in range(10):
+        timeout.record(0.2)
+    assert timeout.value() == 2
+
+def test_timeout_recovers_from_the_floor_after_timeouts():
+    timeout = AdaptiveTimeout(10)
+    for _ in range(10):
+        timeout.record(0.2)
+    timeout.record_timeout(timeout.value())
+    assert timeout.value() >= 4
+    timeout.record_timeout(timeout.value())
+    assert timeout.value() >= 8
+
+def test_timeout_comes_down_gradually_after_successes():
+    timeout = AdaptiveTimeout(10, window=50)
+    for _ in range(40):
+        timeout.record(0.2)
+    timeout.record_timeout(2)
+    raised = timeout.value()
+    timeout.record(0.2)
+    assert 2 <= timeout.value() < raised
+
+class FakeBrowser:
+    def __init__(self, get_seconds=0.0, ready='complete'):
+        self.get_seconds = get_seconds
+        self.ready = ready
+        self.page_load_timeouts = []
+        self.current_url = 'http://fixture/'
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeouts.append(seconds)
+
+    def get(self, url):
+        if self.get_seconds > self.page_load_timeouts[-1]:
+            raise TimeoutException("page load")
+
+    def execute_script(self, script):
+        return self.ready
+
+@pytest.fixture
+def stages(monkeypatch):
+    monkeypatch.setattr(waits, '_timeouts', {})
+    return waits._timeouts
+
+def test_load_page_bounds_get_with_the_stage_timeout(stages):
+    browser = FakeBrowser()
+    load_page(browser, 'http://fixture/jobs/view/1', 'job_page')
+    assert browser.page_load_timeouts == [10]
+    assert len(stages['job_page'].samples) == 1
+    assert 'search_page' not in stages
+
+def test_load_page_timeout_feeds_the_stage(stages):
+    for _ in range(10):
+        waits.record_latency('job_page', 0.2)
+    browser = FakeBrowser(get_seconds=5)
+    with pytest.raises(TimeoutException):
+        load_page(browser, 'http://fixture/jobs/view/1', 'job_page')
+    assert browser.page_load_timeouts == [2]
+    assert waits.stage_timeout('job_page') > 2